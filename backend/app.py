@@ -1,11 +1,19 @@
 import logging
 import os
+import time
+
+_import_started = time.perf_counter()
+
+import click
 from flask import Flask
 from flask_cors import CORS
 from config import Config
 from extensions import db
 from routes.api import api_bp
+from services.store import refresh_snapshot
+from services.warmup import start_warmup
 
+logging.basicConfig(level=Config.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 
@@ -14,7 +22,8 @@ def create_app():
     app.config.from_object(Config)
 
     uri = app.config.get("SQLALCHEMY_DATABASE_URI") or ""
-    if "sqlite" in uri:
+    # Relative sqlite paths go in instance/; absolute ones (e.g. a load-test scratch db) are kept as given.
+    if "sqlite" in uri and not os.path.isabs(uri.split("sqlite:///", 1)[-1]):
         instance_dir = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "instance"
         )
@@ -27,18 +36,34 @@ def create_app():
     CORS(app)
     db.init_app(app)
 
+    started = time.perf_counter()
     with app.app_context():
         try:
             db.create_all()
         except Exception as e:
             logger.exception("db.create_all failed: %s", e)
             raise
+    logger.info("db.create_all took %.3fs", time.perf_counter() - started)
 
     app.register_blueprint(api_bp)
+
+    @app.cli.command("sync-buildings")
+    @click.option("--full", is_flag=True, help="Re-download the whole dataset instead of syncing changes.")
+    def sync_buildings(full):
+        """Publish a new building snapshot (incremental from the last high-water mark by default)."""
+        snap = refresh_snapshot(app.config, full=full)
+        if snap is None:
+            raise click.ClickException("Another worker is refreshing the snapshot; try again when it finishes")
+        click.echo(f"Snapshot v{snap.version}: {len(snap)} buildings")
+
     return app
 
 
 app = create_app()
+logger.info("App import took %.3fs (pid %d)", time.perf_counter() - _import_started, os.getpid())
 
 if __name__ == "__main__":
+    # Warm only in the process that serves requests, not in the debug reloader's watcher process.
+    if app.config.get("WARMUP_ON_START") and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_warmup(app.config)
     app.run(debug=True)
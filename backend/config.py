@@ -3,11 +3,18 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///app.db")
 
+    # Upstream endpoints; the load-test harness points both at local stand-ins (see loadtest/)
+    SOCRATA_BASE_URL = os.getenv("SOCRATA_BASE_URL", "https://data.calgary.ca/resource").rstrip("/")
+    HF_INFERENCE_URL = os.getenv("HF_INFERENCE_URL", "https://api-inference.huggingface.co").rstrip("/")
+
     HEIGHT_DATA = os.getenv("HEIGHT_DATA", "cchr-krqg")
     ROOF_FOOTPRINTS_DATA = os.getenv("ROOF_FOOTPRINTS_DATA", "uc4c-6kbd")
     # Optional: Calgary Land Use District dataset for zoning (e.g. ckwt-snq8). If set, zoning is fetched from this API.
@@ -21,6 +28,20 @@ class Config:
     DOWNTOWN_LEFT = float(os.getenv("DOWNTOWN_LEFT", "-114.12"))
     DOWNTOWN_RIGHT = float(os.getenv("DOWNTOWN_RIGHT", "-114.04"))
 
+    # Memory-mapped building snapshot shared by all gunicorn workers (see services/snapshot.py).
+    SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "").strip() or os.path.join(BASE_DIR, "instance", "snapshots")
+    SNAPSHOT_MAX_AGE = int(os.getenv("SNAPSHOT_MAX_AGE", "3600"))  # seconds before a worker refreshes from upstream
+    SNAPSHOT_LIMIT = int(os.getenv("SNAPSHOT_LIMIT", "5000"))  # buildings kept; requests slice DATASET_LIMIT from it
+    # "incremental" applies rows changed since the last :updated_at high-water mark; "full" re-downloads every refresh.
+    SNAPSHOT_SYNC = os.getenv("SNAPSHOT_SYNC", "incremental").strip().lower()
+    # Bulk exports (/api/export): background-job output directory and buildings materialized per write
+    EXPORT_DIR = os.getenv("EXPORT_DIR", "").strip() or os.path.join(BASE_DIR, "instance", "exports")
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+    # Streamed exports above this (and all FlatGeobuf) must be jobs ({"async": true}) to outlive gunicorn's worker timeout
+    EXPORT_SYNC_MAX_ROWS = int(os.getenv("EXPORT_SYNC_MAX_ROWS", "20000"))
+    # Map the snapshot and build the zoning index in a background thread when each worker starts.
+    WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1").strip().lower() not in ("0", "false", "no")
+
     # Hugging Face Inference API (free tier); .env: HF_API_TOKEN or HUGGINGFACE_API_TOKEN
     HF_API_TOKEN = os.getenv("HF_API_TOKEN") or os.getenv("HUGGINGFACE_API_TOKEN") or os.getenv("HUGGINGFACE_API_KEY")
     # Use a model that works on HF serverless; Mistral-7B returned 410 Gone
@@ -0,0 +1,11 @@
+"""gunicorn settings picked up automatically from backend/ (``gunicorn app:app``)."""
+
+
+def post_worker_init(worker):
+    # Warm each worker after it has loaded the app, rather than at import time: imports also happen in the
+    # master under --preload and in `flask` CLI commands, where a warm-up thread would be wasted or inherited dead.
+    from services.warmup import start_warmup
+
+    app = worker.wsgi
+    if app.config.get("WARMUP_ON_START"):
+        start_warmup(app.config)
@@ -0,0 +1,186 @@
+"""Local stand-ins for the upstream services, so load tests never hit data.calgary.ca or Hugging Face.
+
+``SocrataStandIn`` serves recorded rows (a JSON array dumped from the real API) or a synthetic downtown grid, and
+understands the SoQL the app sends: ``max(:updated_at)``, ``struct_id`` listings, ``:updated_at`` change windows and
+``$limit``/``$offset`` paging. ``InferenceStandIn`` answers the HF text-generation call with a canned filter.
+Both add configurable latency (mean + uniform jitter) to every response.
+"""
+import abc
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Same defaults as Config.DOWNTOWN_*
+DOWNTOWN_BBOX = {"top": 51.058, "bottom": 51.038, "left": -114.12, "right": -114.04}
+ZONING_CODES = ("CC-X", "CC-MH", "CR20-C20/R20", "DC", "R-C1")
+UPDATED_AT = "2024-01-01T00:00:00.000Z"
+
+
+def synthetic_rows(count: int, seed: int = 0) -> List[dict]:
+    """``count`` rectangular footprints on a grid inside the downtown bbox, shaped like the cchr-krqg dataset."""
+    rng = random.Random(seed)
+    cols = max(1, int(count ** 0.5))
+    d_lng = (DOWNTOWN_BBOX["right"] - DOWNTOWN_BBOX["left"]) / (cols + 1)
+    d_lat = (DOWNTOWN_BBOX["top"] - DOWNTOWN_BBOX["bottom"]) / (count // cols + 2)
+    rows = []
+    for i in range(count):
+        lng = DOWNTOWN_BBOX["left"] + d_lng * (i % cols + 0.5)
+        lat = DOWNTOWN_BBOX["bottom"] + d_lat * (i // cols + 0.5)
+        w, h = d_lng * rng.uniform(0.2, 0.7), d_lat * rng.uniform(0.2, 0.7)
+        ground = rng.uniform(1040, 1060)
+        rows.append({
+            ":id": f"row-{i:06d}",
+            ":updated_at": UPDATED_AT,
+            "struct_id": str(100000 + i),
+            "stage": "Existing",
+            "grd_elev_min_z": f"{ground - 1:.2f}",
+            "grd_elev_max_z": f"{ground:.2f}",
+            "rooftop_elev_z": f"{ground + rng.choice([6, 12, 25, 60, 120, 200]) * rng.uniform(0.8, 1.2):.2f}",
+            "polygon": {
+                "type": "MultiPolygon",
+                "coordinates": [[[[lng, lat], [lng + w, lat], [lng + w, lat + h], [lng, lat + h], [lng, lat]]]],
+            },
+        })
+    return rows
+
+
+def synthetic_zoning(cells: int = 4) -> List[dict]:
+    """A ``cells`` x ``cells`` grid of land-use districts covering the downtown bbox."""
+    d_lng = (DOWNTOWN_BBOX["right"] - DOWNTOWN_BBOX["left"]) / cells
+    d_lat = (DOWNTOWN_BBOX["top"] - DOWNTOWN_BBOX["bottom"]) / cells
+    out = []
+    for i in range(cells * cells):
+        lng = DOWNTOWN_BBOX["left"] + d_lng * (i % cells)
+        lat = DOWNTOWN_BBOX["bottom"] + d_lat * (i // cells)
+        out.append({
+            "land_use_district": ZONING_CODES[i % len(ZONING_CODES)],
+            "shape": {
+                "type": "MultiPolygon",
+                "coordinates": [[[[lng, lat], [lng + d_lng, lat], [lng + d_lng, lat + d_lat], [lng, lat + d_lat], [lng, lat]]]],
+            },
+        })
+    return out
+
+
+class _StandIn(abc.ABC):
+    """Runs a ThreadingHTTPServer on a background thread; subclasses provide ``handle(method, path, query, body)``."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method):
+                with stand_in._count_lock:
+                    stand_in.requests += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                stand_in._sleep()
+                status, payload = stand_in.handle(method, parsed.path, query, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _sleep(self) -> None:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    @abc.abstractmethod
+    def handle(self, method: str, path: str, query: dict, body: bytes):
+        """Return ``(status, json_payload)`` for one request."""
+
+    def start(self) -> "_StandIn":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SocrataStandIn(_StandIn):
+    """Serves ``/resource/<dataset>.json``. ``url`` + ``/resource`` is what SOCRATA_BASE_URL should point at."""
+
+    def __init__(self, rows: List[dict], zoning_dataset: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = rows
+        self.zoning_dataset = zoning_dataset
+        self.zoning_rows = synthetic_zoning()
+
+    def handle(self, method, path, query, body):
+        m = re.fullmatch(r"/resource/([\w-]+)\.json", path)
+        if method != "GET" or not m:
+            return 404, {"error": True, "message": f"No route for {method} {path}"}
+        if m.group(1) == self.zoning_dataset:
+            return 200, self.zoning_rows
+
+        select = query.get("$select", "")
+        rows = self.rows
+        if select.startswith("max(:updated_at)"):
+            return 200, [{"high_water_mark": max((r.get(":updated_at", UPDATED_AT) for r in rows), default=UPDATED_AT)}]
+        since = re.search(r":updated_at > '([^']+)'", query.get("$where", ""))
+        if since:
+            rows = [r for r in rows if r.get(":updated_at", UPDATED_AT).rstrip("Z") > since.group(1)]
+
+        offset = int(query.get("$offset", 0))
+        limit = int(query.get("$limit", 1000))
+        page = rows[offset:offset + limit]
+        if select == "struct_id":
+            return 200, [{"struct_id": r.get("struct_id")} for r in page]
+        if not select.startswith(":id"):
+            page = [{k: v for k, v in r.items() if not k.startswith(":")} for r in page]
+        return 200, page
+
+
+class InferenceStandIn(_StandIn):
+    """Serves ``POST /models/<model>`` like the HF Inference API; ``url`` is what HF_INFERENCE_URL should point at."""
+
+    RESPONSES = (
+        ("feet", {"attribute": "height_ft", "operator": ">", "value": 100}),
+        ("floor", {"attribute": "est_floors", "operator": ">", "value": 10}),
+        ("commercial", {"attribute": "zoning", "operator": "contains", "value": "CC"}),
+    )
+    DEFAULT = {"attribute": "height_m", "operator": ">", "value": 50}
+
+    def handle(self, method, path, query, body):
+        if method != "POST" or not path.startswith("/models/"):
+            return 404, {"error": f"No route for {method} {path}"}
+        try:
+            prompt = json.loads(body or b"{}").get("inputs", "")
+        except ValueError:
+            return 400, {"error": "Invalid JSON"}
+        user_query = prompt.split("Query:", 1)[-1].split("\n", 2)[0].lower()
+        filter_obj = next((f for word, f in self.RESPONSES if word in user_query), self.DEFAULT)
+        return 200, [{"generated_text": json.dumps(filter_obj)}]
@@ -0,0 +1,292 @@
+"""Drive the Flask app under concurrent load against local upstream stand-ins and report per-route latency.
+
+    cd backend
+    python -m loadtest --concurrency 16 --duration 30 --mix buildings=4,filter=3,query=1,projects=2
+
+Starts the Socrata and HF stand-ins, launches the app under gunicorn (or ``--server flask``) with its upstream URLs,
+snapshot directory and sqlite database pointed at a scratch directory, waits for ``/api/health/ready``, then runs
+the request mix for ``--duration`` seconds (or ``--requests`` total). Use ``--target`` to load an app that is
+already running instead; it must have been started with SOCRATA_BASE_URL / HF_INFERENCE_URL set to the stand-ins
+if upstream traffic should stay local.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from loadtest.fakes import InferenceStandIn, SocrataStandIn, synthetic_rows
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ZONING_DATASET = "loadtest-zoning"
+
+FILTER_BODIES = (
+    {"filters": [{"attribute": "height_m", "operator": ">", "value": 50}]},
+    {"filters": [{"attribute": "zoning", "operator": "contains", "value": "CC"}], "sort": "height_m", "order": "desc", "limit": 20},
+    {"filters": [{"attribute": "est_floors", "operator": ">=", "value": 10}], "sort": "footprint_area_m2", "order": "desc", "limit": 50},
+    {"filters": [], "sort": "height_ft", "order": "asc", "limit": 100},
+)
+QUERIES = (
+    "buildings over 100 feet",
+    "show commercial buildings",
+    "more than 10 floors",
+    "tallest towers",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _parse_mix(spec: str) -> Dict[str, int]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class Recorder:
+    """Thread-safe latency/status collection keyed by route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+
+def _timed(rec: Recorder, route: str, session: requests.Session, method: str, url: str, **kwargs):
+    started = time.perf_counter()
+    try:
+        r = session.request(method, url, timeout=120, **kwargs)
+        ok = r.status_code < 400
+    except requests.RequestException:
+        r, ok = None, False
+    rec.record(route, time.perf_counter() - started, ok)
+    return r
+
+
+def _buildings(base, session, rec, state):
+    _timed(rec, "GET /buildings", session, "GET", f"{base}/buildings")
+
+
+def _filter(base, session, rec, state):
+    _timed(rec, "POST /filter", session, "POST", f"{base}/filter", json=random.choice(FILTER_BODIES))
+
+
+def _query(base, session, rec, state):
+    _timed(rec, "POST /query", session, "POST", f"{base}/query", json={"query": random.choice(QUERIES)})
+
+
+def _projects(base, session, rec, state):
+    if "user_id" not in state:
+        r = _timed(rec, "POST /users/identify", session, "POST", f"{base}/users/identify",
+                   json={"username": f"loadtest-{threading.get_ident()}"})
+        if r is None or not r.ok:
+            return
+        state["user_id"] = r.json()["id"]
+        state["project_ids"] = []
+    user_id = state["user_id"]
+    action = random.choice(("list", "save", "load")) if state["project_ids"] else "save"
+    if action == "list":
+        _timed(rec, "GET /users/<id>/projects", session, "GET", f"{base}/users/{user_id}/projects")
+    elif action == "save":
+        body = {"name": f"loadtest {time.time():.3f}", "filters": random.choice(FILTER_BODIES)["filters"]}
+        r = _timed(rec, "POST /users/<id>/projects", session, "POST", f"{base}/users/{user_id}/projects", json=body)
+        if r is not None and r.ok:
+            state["project_ids"].append(r.json()["id"])
+    else:
+        project_id = random.choice(state["project_ids"])
+        _timed(rec, "GET /projects/<id>", session, "GET", f"{base}/projects/{project_id}")
+
+
+SCENARIOS = {"buildings": _buildings, "filter": _filter, "query": _query, "projects": _projects}
+
+
+def _worker(base: str, mix: Dict[str, int], rec: Recorder, deadline: float, budget: Optional[list], lock) -> None:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    session = requests.Session()
+    state = {}
+    while time.monotonic() < deadline:
+        if budget is not None:
+            with lock:
+                if budget[0] <= 0:
+                    return
+                budget[0] -= 1
+        SCENARIOS[random.choices(names, weights)[0]](base, session, rec, state)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    k = math.ceil(pct / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, k))]
+
+
+def summarize(rec: Recorder, elapsed: float) -> List[dict]:
+    rows = []
+    for route in sorted(rec.latencies):
+        values = sorted(rec.latencies[route])
+        rows.append({
+            "route": route,
+            "requests": len(values),
+            "errors": rec.errors[route],
+            "error_rate": rec.errors[route] / len(values),
+            "rps": len(values) / elapsed if elapsed else 0.0,
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p90_ms": _percentile(values, 90) * 1000,
+            "p99_ms": _percentile(values, 99) * 1000,
+            "max_ms": values[-1] * 1000,
+        })
+    return rows
+
+
+def _print_report(rows: List[dict], elapsed: float) -> None:
+    header = f"{'route':<28}{'reqs':>7}{'err%':>7}{'rps':>8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(
+            f"{r['route']:<28}{r['requests']:>7}{r['error_rate'] * 100:>6.1f}%{r['rps']:>8.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p90_ms']:>9.1f}{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}"
+        )
+    total = sum(r["requests"] for r in rows)
+    errors = sum(r["errors"] for r in rows)
+    print("-" * len(header))
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} req/s), {errors} errors")
+
+
+def _start_app(args, socrata_url: str, hf_url: str, scratch: str):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        SOCRATA_BASE_URL=f"{socrata_url}/resource",
+        HF_INFERENCE_URL=hf_url,
+        HF_API_TOKEN="loadtest",
+        ZONING_DATASET=ZONING_DATASET,
+        SNAPSHOT_DIR=os.path.join(scratch, "snapshots"),
+        DATABASE_URL="sqlite:///" + os.path.join(scratch, "loadtest.db").replace("\\", "/"),
+        DATASET_LIMIT=str(args.dataset_limit),
+        LOG_LEVEL="WARNING",
+    )
+    if args.server == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "app:app", "-w", str(args.workers), "-b", f"127.0.0.1:{port}"]
+    else:
+        cmd = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port), "--with-threads"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    return proc, f"http://127.0.0.1:{port}/api"
+
+
+def _wait_ready(base: str, timeout: float, proc=None) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f"App exited with code {proc.returncode} before becoming ready")
+        try:
+            if requests.get(f"{base}/health/ready", timeout=5).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"App not ready after {timeout:.0f}s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", help="Base URL of an already running API (e.g. http://127.0.0.1:5000/api)")
+    parser.add_argument("--server", choices=("gunicorn", "flask"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests in total")
+    parser.add_argument("--mix", default="buildings=4,filter=3,query=1,projects=2")
+    parser.add_argument("--rows", help="JSON array of recorded Socrata rows to serve (default: synthetic)")
+    parser.add_argument("--synthetic-rows", type=int, default=2000)
+    parser.add_argument("--dataset-limit", type=int, default=1000, help="DATASET_LIMIT for the launched app")
+    parser.add_argument("--upstream-latency-ms", type=float, default=150.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--hf-latency-ms", type=float, default=400.0)
+    parser.add_argument("--ready-timeout", type=float, default=120.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+    mix = _parse_mix(args.mix)
+
+    if args.rows:
+        with open(args.rows, "r", encoding="utf-8") as fh:
+            rows = json.load(fh)
+    else:
+        rows = synthetic_rows(args.synthetic_rows)
+    socrata = SocrataStandIn(
+        rows, zoning_dataset=ZONING_DATASET, latency_ms=args.upstream_latency_ms, jitter_ms=args.upstream_jitter_ms
+    ).start()
+    hf = InferenceStandIn(latency_ms=args.hf_latency_ms, jitter_ms=args.hf_latency_ms / 4).start()
+
+    proc = None
+    with tempfile.TemporaryDirectory(prefix="masiv-loadtest-") as scratch:
+        try:
+            if args.target:
+                base = args.target.rstrip("/")
+            else:
+                proc, base = _start_app(args, socrata.url, hf.url, scratch)
+            warm_started = time.monotonic()
+            _wait_ready(base, args.ready_timeout, proc)
+            warm_s = time.monotonic() - warm_started
+
+            rec = Recorder()
+            budget = [args.requests] if args.requests else None
+            lock = threading.Lock()
+            started = time.monotonic()
+            deadline = started + args.duration
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                futures = [
+                    pool.submit(_worker, base, mix, rec, deadline, budget, lock) for _ in range(args.concurrency)
+                ]
+                for future in futures:
+                    future.result()  # re-raise a crashed worker instead of reporting its silence as low load
+            elapsed = time.monotonic() - started
+        finally:
+            if proc is not None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            socrata.stop()
+            hf.stop()
+
+    rows_out = summarize(rec, elapsed)
+    if args.json:
+        print(json.dumps({
+            "elapsed_s": elapsed,
+            "ready_after_s": warm_s,
+            "upstream_requests": {"socrata": socrata.requests, "hf": hf.requests},
+            "routes": rows_out,
+        }, indent=2))
+    else:
+        print(f"Ready after {warm_s:.1f}s; upstream requests: socrata={socrata.requests} hf={hf.requests}\n")
+        _print_report(rows_out, elapsed)
+    return 1 if not rows_out else 0
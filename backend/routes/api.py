@@ -1,44 +1,86 @@
 import json
 import logging
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, send_file
 from extensions import db
 from models import User, Project
-from services.cityData import fetch_buildings, fetch_building_by_id
-from services.filters import apply_filters
+from services.cityData import fetch_building_by_id
+from services.export import (
+    FORMATS,
+    ExportError,
+    check_sync_export,
+    export_filename,
+    export_stream,
+    job_output_path,
+    job_status,
+    require_format,
+    start_export_job,
+)
 from services.llm import query_llm_for_filter
+from services.query import (
+    CursorExpired,
+    QueryError,
+    decode_cursor,
+    parse_export_params,
+    parse_page_params,
+    query_snapshot,
+    select_rows,
+)
+from services.store import get_building, get_buildings, get_snapshot, get_snapshot_version
+from services.warmup import start_warmup, warmup_state
 
 logger = logging.getLogger(__name__)
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
 
-def get_downtown_bbox(cfg):
-    return {
-        "top": cfg.get("DOWNTOWN_TOP"),
-        "bottom": cfg.get("DOWNTOWN_BOTTOM"),
-        "left": cfg.get("DOWNTOWN_LEFT"),
-        "right": cfg.get("DOWNTOWN_RIGHT"),
-    }
+def filtered_page(cfg, filters, body):
+    """Sorted/paginated filter results; raises QueryError for bad params, CursorExpired for old cursors."""
+    params = parse_page_params(body)
+    if params["cursor"]:
+        cursor = decode_cursor(params["cursor"])
+        snap = get_snapshot_version(cfg, cursor["v"])
+        if snap is None:
+            raise CursorExpired("Cursor refers to a snapshot that is no longer available; restart from the first page")
+    else:
+        cursor = None
+        snap = get_snapshot(cfg)
+    page = query_snapshot(
+        snap,
+        filters,
+        pool=len(snap),
+        sort=params["sort"],
+        order=params["order"],
+        limit=params["limit"] or cfg["DATASET_LIMIT"],
+        cursor=cursor,
+    )
+    page.update(sort=params["sort"], order=params["order"])
+    return page
 
 
 @api_bp.get("/health")
+@api_bp.get("/health/live")
 def health():
+    """Liveness: the process is up and serving requests."""
     return jsonify({"status": "ok"})
 
 
+@api_bp.get("/health/ready")
+def readiness():
+    """Readiness: this worker has the building snapshot mapped. Load balancers should route on this."""
+    state = warmup_state()
+    if state["status"] == "ready":
+        return jsonify(state)
+    start_warmup(current_app.config)  # no-op while warming, and rate-limited after a failure
+    return jsonify(state), 503
+
+
 @api_bp.get("/buildings")
 def buildings():
     cfg = current_app.config
     try:
-        payload = fetch_buildings(
-            dataset_id=cfg["HEIGHT_DATA"],
-            limit=cfg["DATASET_LIMIT"],
-            app_token=cfg.get("DATASET_TOKEN", ""),
-            bbox=get_downtown_bbox(cfg),
-            zoning_dataset_id=cfg.get("ZONING_DATASET"),
-        )
+        payload = get_buildings(cfg, cfg["DATASET_LIMIT"])
         return jsonify(payload)
     except Exception as e:
-        logger.exception("fetch_buildings failed")
+        logger.exception("get_buildings failed")
         return jsonify({"error": str(e), "buildings": [], "count": 0}), 503
 
 
@@ -46,11 +88,15 @@ def buildings():
 def building_details(building_id):
     cfg = current_app.config
     try:
-        b = fetch_building_by_id(
-            dataset_id=cfg["HEIGHT_DATA"],
-            struct_id=building_id,
-            app_token=cfg.get("DATASET_TOKEN", ""),
-        )
+        b = get_building(cfg, building_id)
+        if b is None:
+            # Outside the downtown snapshot; fall back to the upstream lookup.
+            b = fetch_building_by_id(
+                base_url=cfg["SOCRATA_BASE_URL"],
+                dataset_id=cfg["HEIGHT_DATA"],
+                struct_id=building_id,
+                app_token=cfg.get("DATASET_TOKEN", ""),
+            )
     except Exception as e:
         logger.exception("fetch_building_by_id failed")
         return jsonify({"error": str(e)}), 503
@@ -63,23 +109,19 @@ def building_details(building_id):
 def filter_buildings():
     cfg = current_app.config
     body = request.get_json(silent=True) or {}
-    limit = int(body.get("limit", cfg["DATASET_LIMIT"]))
     filters = body.get("filters") if isinstance(body.get("filters"), list) else []
 
     try:
-        payload = fetch_buildings(
-            dataset_id=cfg["HEIGHT_DATA"],
-            limit=limit,
-            app_token=cfg.get("DATASET_TOKEN", ""),
-            bbox=get_downtown_bbox(cfg),
-            zoning_dataset_id=cfg.get("ZONING_DATASET"),
-        )
+        page = filtered_page(cfg, filters, body)
+    except CursorExpired as e:
+        return jsonify({"error": str(e), "buildings": [], "count": 0, "filters": filters}), 410
+    except QueryError as e:
+        return jsonify({"error": str(e), "buildings": [], "count": 0, "filters": filters}), 400
     except Exception as e:
-        logger.exception("fetch_buildings failed in filter")
+        logger.exception("get_buildings failed in filter")
         return jsonify({"error": str(e), "buildings": [], "count": 0, "filters": filters}), 503
 
-    filtered = apply_filters(payload["buildings"], filters)
-    return jsonify({"count": len(filtered), "filters": filters, "buildings": filtered})
+    return jsonify({"filters": filters, **page})
 
 
 @api_bp.post("/query")
@@ -90,30 +132,104 @@ def llm_query():
     if not user_query:
         return jsonify({"error": "Missing 'query' in body", "filters": [], "buildings": []}), 400
 
-    api_token = cfg.get("HF_API_TOKEN") or cfg.get("HUGGINGFACE_API_TOKEN")
-    model = cfg.get("HUGGINGFACE_MODEL", "mistralai/Mistral-7B-Instruct-v0.3")
-    if not api_token:
-        return jsonify({"error": "Hugging Face API token not configured", "filters": [], "buildings": []}), 503
+    try:
+        params = parse_page_params(body)
+    except QueryError as e:
+        return jsonify({"error": str(e), "query": user_query, "filters": [], "buildings": [], "count": 0}), 400
 
-    filter_obj = query_llm_for_filter(user_query, api_token, model)
-    filters = [filter_obj] if filter_obj else []
+    if params["cursor"]:
+        # Later pages reuse the first page's filters instead of asking the model again: that would cost another
+        # round-trip, and a different answer would no longer match the cursor.
+        filters = body.get("filters")
+        if not isinstance(filters, list):
+            return jsonify({
+                "error": "Send back the 'filters' from the first page along with 'cursor'",
+                "query": user_query, "filters": [], "buildings": [], "count": 0,
+            }), 400
+    else:
+        api_token = cfg.get("HF_API_TOKEN") or cfg.get("HUGGINGFACE_API_TOKEN")
+        model = cfg.get("HUGGINGFACE_MODEL", "mistralai/Mistral-7B-Instruct-v0.3")
+        if not api_token:
+            return jsonify({"error": "Hugging Face API token not configured", "filters": [], "buildings": []}), 503
+        filter_obj = query_llm_for_filter(user_query, api_token, model, cfg["HF_INFERENCE_URL"])
+        filters = [filter_obj] if filter_obj else []
 
     try:
-        payload = fetch_buildings(
-            dataset_id=cfg["HEIGHT_DATA"],
-            limit=cfg["DATASET_LIMIT"],
-            app_token=cfg.get("DATASET_TOKEN", ""),
-            bbox=get_downtown_bbox(cfg),
-            zoning_dataset_id=cfg.get("ZONING_DATASET"),
-        )
+        page = filtered_page(cfg, filters, body)
+    except CursorExpired as e:
+        return jsonify({"error": str(e), "query": user_query, "filters": filters, "buildings": [], "count": 0}), 410
+    except QueryError as e:
+        return jsonify({"error": str(e), "query": user_query, "filters": filters, "buildings": [], "count": 0}), 400
     except Exception as e:
-        logger.exception("fetch_buildings failed in query")
+        logger.exception("get_buildings failed in query")
         return jsonify({"error": str(e), "query": user_query, "filters": filters, "buildings": [], "count": 0}), 503
 
-    buildings_list = payload["buildings"]
-    if filters:
-        buildings_list = apply_filters(buildings_list, filters)
-    return jsonify({"query": user_query, "filters": filters, "count": len(buildings_list), "buildings": buildings_list})
+    return jsonify({"query": user_query, "filters": filters, **page})
+
+
+@api_bp.post("/export")
+def export_buildings():
+    """Stream filtered buildings as GeoJSON sequence, GeoParquet or FlatGeobuf; {"async": true} runs it as a job."""
+    cfg = current_app.config
+    body = request.get_json(silent=True) or {}
+    filters = body.get("filters") if isinstance(body.get("filters"), list) else []
+    fmt = str(body.get("format") or "geojsonseq").lower()
+
+    try:
+        require_format(fmt)
+        params = parse_export_params(body)
+        snap = get_snapshot(cfg)
+        # Exports cover the whole snapshot, not just the DATASET_LIMIT slice the map shows.
+        rows = select_rows(snap, filters, len(snap), params["sort"], params["order"], params["limit"])
+        if body.get("async"):
+            job = start_export_job(cfg["EXPORT_DIR"], snap, rows, fmt, cfg["EXPORT_CHUNK_SIZE"])
+            job["status_url"] = f"/api/export/{job['job_id']}"
+            job["download_url"] = f"/api/export/{job['job_id']}/download"
+            return jsonify(job), 202
+        check_sync_export(fmt, len(rows), cfg["EXPORT_SYNC_MAX_ROWS"])
+        stream = export_stream(snap, rows, fmt, cfg["EXPORT_CHUNK_SIZE"])
+    except (QueryError, ExportError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.exception("export failed")
+        return jsonify({"error": str(e)}), 503
+
+    return Response(
+        stream,
+        mimetype=FORMATS[fmt][0],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(snap, fmt)}"',
+            "X-Export-Count": str(len(rows)),
+        },
+    )
+
+
+@api_bp.get("/export/<string:job_id>")
+def export_job_status(job_id):
+    status = job_status(current_app.config["EXPORT_DIR"], job_id)
+    if status is None:
+        return jsonify({"error": "Export job not found"}), 404
+    return jsonify(status)
+
+
+@api_bp.get("/export/<string:job_id>/download")
+def export_job_download(job_id):
+    export_dir = current_app.config["EXPORT_DIR"]
+    status = job_status(export_dir, job_id)
+    if status is None:
+        return jsonify({"error": "Export job not found"}), 404
+    if status["status"] != "done":
+        return jsonify(status), 409
+    try:
+        return send_file(
+            job_output_path(export_dir, job_id),
+            mimetype=FORMATS[status["format"]][0],
+            as_attachment=True,
+            download_name=status["filename"],
+        )
+    except FileNotFoundError:
+        # Pruned after JOB_TTL_SECONDS (or removed by hand) while its status file survived.
+        return jsonify({"error": "Export output is no longer available; start a new export"}), 410
 
 
 @api_bp.post("/users/identify")
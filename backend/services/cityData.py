@@ -15,6 +15,9 @@ DOWNTOWN_ORIGIN_LNG = -114.067
 M_PER_DEG_LAT = 111_000
 M_PER_DEG_LNG = 69_800  # 111000 * cos(51°)
 
+# Typical storey height used to estimate floor counts from building height
+FLOOR_HEIGHT_M = 3.5
+
 
 def to_float(x):
     try:
@@ -77,6 +80,64 @@ def footprint_to_local_meters(geom_type: str, coords: Any) -> Optional[Any]:
     return None
 
 
+def _ring_area_perimeter(ring) -> tuple:
+    """Shoelace area (absolute) and perimeter of one closed or open ring in local meters."""
+    n = len(ring)
+    if n < 3:
+        return 0.0, 0.0
+    area2 = 0.0
+    perimeter = 0.0
+    x0, z0 = ring[-1][0], ring[-1][1]
+    for p in ring:
+        x1, z1 = p[0], p[1]
+        area2 += x0 * z1 - x1 * z0
+        perimeter += ((x1 - x0) ** 2 + (z1 - z0) ** 2) ** 0.5
+        x0, z0 = x1, z1
+    return abs(area2) / 2.0, perimeter
+
+
+def footprint_metrics(footprint_local: Optional[List], centroid: Optional[dict], height_m: Optional[float]) -> dict:
+    """Planar metrics computed once at ingest: area (outer rings minus holes), outer perimeter, volume,
+    estimated floors, gross floor area (footprint x floors) and the max vertex distance from the centroid."""
+    if not footprint_local:
+        return {
+            "footprint_area_m2": None,
+            "perimeter_m": None,
+            "volume_m3": None,
+            "est_floors": None,
+            "floor_area_m2": None,
+            "bounding_radius_m": None,
+        }
+    # Without a centroid there is nothing to measure the radius from (distance to the local origin is meaningless).
+    center = lng_lat_to_local_meters(centroid["lng"], centroid["lat"]) if centroid else None
+    area = 0.0
+    perimeter = 0.0
+    radius2 = 0.0
+    for poly in footprint_local:
+        for ri, ring in enumerate(poly):
+            a, p = _ring_area_perimeter(ring)
+            if ri == 0:
+                area += a
+                perimeter += p
+            else:
+                area -= a
+            if center is not None:
+                for pt in ring:
+                    radius2 = max(radius2, (pt[0] - center[0]) ** 2 + (pt[1] - center[1]) ** 2)
+    area = max(area, 0.0)
+    est_floors = None
+    if height_m is not None:
+        est_floors = max(1, int(round(height_m / FLOOR_HEIGHT_M))) if height_m > 0 else 0
+    return {
+        "footprint_area_m2": area,
+        "perimeter_m": perimeter,
+        "volume_m3": area * height_m if height_m is not None else None,
+        "est_floors": est_floors,
+        "floor_area_m2": area * est_floors if est_floors is not None else None,
+        "bounding_radius_m": radius2 ** 0.5 if center is not None else None,
+    }
+
+
 def build_address(props: dict, centroid: Optional[dict]) -> str:
     addr = (props or {}).get("address") or (props or {}).get("full_address")
     if addr:
@@ -117,6 +178,7 @@ def normalize_feature(feature: dict) -> dict:
     height_ft = (height_m * 3.28084) if height_m is not None else None
 
     footprint_local = footprint_to_local_meters(geom_type, coords)
+    metrics = footprint_metrics(footprint_local, centroid, height_m)
 
     return {
         "id": props.get("struct_id"),
@@ -131,6 +193,7 @@ def normalize_feature(feature: dict) -> dict:
         "ground_elev_z": ground,
         "address": build_address(props, centroid),
         "zoning": props.get("zoning") or None,
+        **metrics,
     }
 
 
@@ -165,7 +228,7 @@ def _in_bbox(centroid: Optional[dict], bbox: Optional[dict]) -> bool:
 
 def _row_to_feature(row: dict) -> dict:
     polygon = row.get("polygon") or {}
-    props = {k: v for k, v in row.items() if k != "polygon"}
+    props = {k: v for k, v in row.items() if k != "polygon" and not k.startswith(":")}
     return {
         "type": "Feature",
         "geometry": polygon if isinstance(polygon, dict) else {},
@@ -173,7 +236,19 @@ def _row_to_feature(row: dict) -> dict:
     }
 
 
+def normalize_row(row: Any) -> Optional[dict]:
+    """Normalize one Socrata row (or GeoJSON feature); None if it carries no geometry."""
+    if isinstance(row, dict) and "polygon" in row:
+        feature = _row_to_feature(row)
+    elif isinstance(row, dict) and row.get("geometry"):
+        feature = row
+    else:
+        return None
+    return normalize_feature(feature)
+
+
 def _fetch_zoning_for_bbox(
+    base_url: str,
     zoning_dataset_id: str,
     bbox: Optional[dict],
     app_token: str = "",
@@ -181,7 +256,7 @@ def _fetch_zoning_for_bbox(
     if not bbox:
         return []
     try:
-        url = f"https://data.calgary.ca/resource/{zoning_dataset_id}.json"
+        url = f"{base_url}/{zoning_dataset_id}.json"
         params = {"$limit": 2000}
         where = build_where_clause(bbox, "shape")
         if where:
@@ -210,11 +285,70 @@ def _fetch_zoning_for_bbox(
     return out
 
 
-def _enrich_buildings_with_zoning(buildings: List[dict], zoning_features: List[Dict]) -> None:
+class ZoningIndex:
+    """Land-use polygons parsed once into an STRtree; shapely is imported here, on first use."""
+
+    def __init__(self, zoning_features: List[Dict]):
+        from shapely.geometry import shape
+        from shapely.strtree import STRtree
+
+        self.codes = []
+        self.geoms = []
+        for zf in zoning_features:
+            geom = zf.get("geom")
+            code = zf.get("zoning_code")
+            if not isinstance(geom, dict) or not code:
+                continue
+            try:
+                self.geoms.append(shape(geom))
+            except Exception:
+                continue
+            self.codes.append(code)
+        self._tree = STRtree(self.geoms)
+
+    def __len__(self) -> int:
+        return len(self.geoms)
+
+    def lookup(self, lng: float, lat: float) -> Optional[str]:
+        from shapely.geometry import Point
+
+        pt = Point(float(lng), float(lat))
+        # Lowest index first, matching the upstream row order the linear scan used.
+        for i in sorted(int(i) for i in self._tree.query(pt)):
+            if self.geoms[i].contains(pt):
+                return self.codes[i]
+        return None
+
+
+ZONING_INDEX_TTL = 3600
+_zoning_indexes: Dict[tuple, tuple] = {}
+
+
+def get_zoning_index(
+    base_url: str,
+    zoning_dataset_id: str,
+    bbox: Optional[dict],
+    app_token: str = "",
+) -> Optional[ZoningIndex]:
+    """Per-process zoning index for ``bbox``, rebuilt after ``ZONING_INDEX_TTL`` seconds. None if unavailable."""
+    key = (base_url, zoning_dataset_id, tuple(sorted((bbox or {}).items())))
+    cached = _zoning_indexes.get(key)
+    if cached and time.time() - cached[0] < ZONING_INDEX_TTL:
+        return cached[1]
+    zoning_features = _fetch_zoning_for_bbox(base_url, zoning_dataset_id, bbox, app_token)
+    if not zoning_features:
+        return None
+    started = time.monotonic()
     try:
-        from shapely.geometry import shape, Point
+        index = ZoningIndex(zoning_features)
     except ImportError:
-        return
+        return None
+    logger.info("Built zoning index (%d polygons) in %.2fs", len(index), time.monotonic() - started)
+    _zoning_indexes[key] = (time.time(), index)
+    return index
+
+
+def _enrich_buildings_with_zoning(buildings: List[dict], index: ZoningIndex) -> None:
     for b in buildings:
         if b.get("zoning"):
             continue
@@ -225,61 +359,57 @@ def _enrich_buildings_with_zoning(buildings: List[dict], zoning_features: List[D
         lat = cent.get("lat")
         if lng is None or lat is None:
             continue
-        pt = Point(float(lng), float(lat))
-        for zf in zoning_features:
-            geom = zf.get("geom")
-            code = zf.get("zoning_code")
-            if not geom or not code:
-                continue
-            try:
-                if isinstance(geom, dict):
-                    poly = shape(geom)
-                else:
-                    continue
-                if poly.contains(pt):
-                    b["zoning"] = code
-                    break
-            except Exception as _:
-                continue
+        code = index.lookup(lng, lat)
+        if code:
+            b["zoning"] = code
 
 
 def fetch_buildings(
+    base_url: str,
     dataset_id: str,
     limit: int,
     app_token: str = "",
     bbox: Optional[dict] = None,
     zoning_dataset_id: Optional[str] = None,
 ) -> dict:
-    url = f"https://data.calgary.ca/resource/{dataset_id}.json"
-    params = {"$limit": 5000}
+    url = f"{base_url}/{dataset_id}.json"
     headers = {}
     if app_token:
         headers["X-App-Token"] = app_token
 
-    r = requests.get(url, params=params, headers=headers, timeout=60)
-    r.raise_for_status()
-    data = r.json()
+    # Same bbox filter as the incremental sync, so both paths select the same rows; ordered so paging is stable.
+    base_params = {"$order": ":id"}
+    where = build_where_clause(bbox, "polygon")
+    if where:
+        base_params["$where"] = where
+    page_size = max(limit, 1000)
 
-    rows = data if isinstance(data, list) else data.get("features", [])
     buildings = []
-    for row in rows:
-        if isinstance(row, dict) and "polygon" in row:
-            feature = _row_to_feature(row)
-        elif isinstance(row, dict) and row.get("geometry"):
-            feature = row
-        else:
-            continue
-        b = normalize_feature(feature)
-        if bbox and not _in_bbox(b.get("centroid"), bbox):
-            continue
-        buildings.append(b)
-        if len(buildings) >= limit:
+    offset = 0
+    while len(buildings) < limit:
+        params = dict(base_params, **{"$limit": page_size, "$offset": offset})
+        r = requests.get(url, params=params, headers=headers, timeout=60)
+        r.raise_for_status()
+        data = r.json()
+
+        rows = data if isinstance(data, list) else data.get("features", [])
+        for row in rows:
+            b = normalize_row(row)
+            if b is None:
+                continue
+            if bbox and not _in_bbox(b.get("centroid"), bbox):
+                continue
+            buildings.append(b)
+            if len(buildings) >= limit:
+                break
+        if len(rows) < page_size:
             break
+        offset += page_size
 
     if zoning_dataset_id and bbox:
-        zoning_features = _fetch_zoning_for_bbox(zoning_dataset_id, bbox, app_token)
-        if zoning_features:
-            _enrich_buildings_with_zoning(buildings, zoning_features)
+        zoning_index = get_zoning_index(base_url, zoning_dataset_id, bbox, app_token)
+        if zoning_index is not None:
+            _enrich_buildings_with_zoning(buildings, zoning_index)
 
     return {
         "count": len(buildings),
@@ -289,10 +419,100 @@ def fetch_buildings(
     }
 
 
+def _socrata_timestamp(value: str) -> str:
+    # :updated_at comes back as "2024-05-01T12:00:00.000Z"; SoQL literals take it without the zone suffix.
+    return str(value).rstrip("Z")
+
+
+def fetch_high_water_mark(base_url: str, dataset_id: str, app_token: str = "") -> Optional[str]:
+    """Latest ``:updated_at`` in the dataset, taken before a full fetch so later syncs resume from it."""
+    url = f"{base_url}/{dataset_id}.json"
+    params = {"$select": "max(:updated_at) AS high_water_mark"}
+    headers = {}
+    if app_token:
+        headers["X-App-Token"] = app_token
+
+    r = requests.get(url, params=params, headers=headers, timeout=30)
+    r.raise_for_status()
+    data = r.json()
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        return data[0].get("high_water_mark")
+    return None
+
+
+def fetch_changed_rows(
+    base_url: str,
+    dataset_id: str,
+    since: str,
+    bbox: Optional[dict] = None,
+    app_token: str = "",
+    page_size: int = 1000,
+) -> List[dict]:
+    """Rows with ``:updated_at`` after ``since``, oldest first, including the ``:id``/``:updated_at`` system fields."""
+    url = f"{base_url}/{dataset_id}.json"
+    headers = {}
+    if app_token:
+        headers["X-App-Token"] = app_token
+
+    where = f":updated_at > '{_socrata_timestamp(since)}'"
+    in_box = build_where_clause(bbox, "polygon")
+    if in_box:
+        where = f"{where} AND {in_box}"
+
+    out = []
+    offset = 0
+    while True:
+        params = {
+            "$select": ":id, :updated_at, *",
+            "$where": where,
+            "$order": ":updated_at, :id",
+            "$limit": page_size,
+            "$offset": offset,
+        }
+        r = requests.get(url, params=params, headers=headers, timeout=60)
+        r.raise_for_status()
+        data = r.json()
+        page = data if isinstance(data, list) else []
+        out.extend(row for row in page if isinstance(row, dict))
+        if len(page) < page_size:
+            return out
+        offset += page_size
+
+
+def fetch_live_struct_ids(
+    base_url: str,
+    dataset_id: str,
+    bbox: Optional[dict] = None,
+    app_token: str = "",
+    page_size: int = 50000,
+) -> set:
+    """``struct_id`` values currently in the dataset (ids only, within ``bbox``), used to detect deleted structures."""
+    url = f"{base_url}/{dataset_id}.json"
+    headers = {}
+    if app_token:
+        headers["X-App-Token"] = app_token
+
+    out = set()
+    offset = 0
+    while True:
+        params = {"$select": "struct_id", "$order": ":id", "$limit": page_size, "$offset": offset}
+        where = build_where_clause(bbox, "polygon")
+        if where:
+            params["$where"] = where
+        r = requests.get(url, params=params, headers=headers, timeout=60)
+        r.raise_for_status()
+        data = r.json()
+        page = data if isinstance(data, list) else []
+        out.update(str(row["struct_id"]) for row in page if isinstance(row, dict) and row.get("struct_id") is not None)
+        if len(page) < page_size:
+            return out
+        offset += page_size
+
+
 def fetch_building_by_id(
-    dataset_id: str, struct_id: str, app_token: str = ""
+    base_url: str, dataset_id: str, struct_id: str, app_token: str = ""
 ) -> Optional[dict]:
-    url = f"https://data.calgary.ca/resource/{dataset_id}.json"
+    url = f"{base_url}/{dataset_id}.json"
     params = {}
     headers = {}
     if app_token:
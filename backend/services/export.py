@@ -0,0 +1,321 @@
+"""Bulk export of filtered buildings as GeoJSON sequence, GeoParquet or FlatGeobuf.
+
+Rows are materialized from the snapshot ``chunk_size`` at a time and written out before the next chunk is read,
+so memory stays bounded whatever the export size. GeoJSON sequence (RFC 8142) needs nothing extra; GeoParquet
+needs pyarrow and FlatGeobuf needs fiona (GDAL), both optional. Large exports can run as a background job that
+writes under EXPORT_DIR; job state lives in a JSON file next to the output so any gunicorn worker can serve it.
+"""
+import importlib.util
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from typing import Iterator, List, Optional
+
+from services.snapshot import ATTRIBUTE_COLUMNS, INTEGER_COLUMNS, BuildingSnapshot
+
+logger = logging.getLogger(__name__)
+
+# format -> (mimetype, file extension)
+FORMATS = {
+    "geojsonseq": ("application/geo+json-seq", ".geojsons"),
+    "geoparquet": ("application/vnd.apache.parquet", ".parquet"),
+    "flatgeobuf": ("application/flatgeobuf", ".fgb"),
+}
+# format -> optional modules it needs
+REQUIREMENTS = {"geoparquet": ("pyarrow", "shapely"), "flatgeobuf": ("fiona",)}
+STRING_PROPERTIES = ("id", "stage", "address", "zoning")
+RECORD_SEPARATOR = b"\x1e"
+JOB_TTL_SECONDS = 24 * 3600
+JOB_HEARTBEAT_SECONDS = 10
+JOB_STALE_SECONDS = 60
+_JOB_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class ExportError(ValueError):
+    """Unsupported format or missing optional dependency (HTTP 400)."""
+
+
+def require_format(fmt: str) -> None:
+    """Raise ExportError unless ``fmt`` is known and its optional dependencies are importable."""
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown export format '{fmt}'. Choose from: {', '.join(FORMATS)}")
+    missing = [name for name in REQUIREMENTS.get(fmt, ()) if importlib.util.find_spec(name) is None]
+    if missing:
+        raise ExportError(f"{fmt} export needs {', '.join(missing)} installed")
+
+
+def check_sync_export(fmt: str, count: int, max_rows: int) -> None:
+    """Raise ExportError for exports that should run as a job instead of streaming in the request.
+
+    A sync gunicorn worker is killed after its ``timeout`` (30 s by default) and the client is left with a truncated
+    file. FlatGeobuf sends nothing until GDAL has written the whole file, so it always goes through a job.
+    """
+    if fmt == "flatgeobuf":
+        raise ExportError('FlatGeobuf exports run as background jobs; send "async": true')
+    if count > max_rows:
+        raise ExportError(
+            f'{count} buildings is over the {max_rows} streamed-export limit (EXPORT_SYNC_MAX_ROWS); send "async": true'
+        )
+
+
+def _properties(b: dict) -> dict:
+    props = {name: b.get(name) for name in STRING_PROPERTIES}
+    props.update((name, b.get(name)) for name in ATTRIBUTE_COLUMNS)
+    return props
+
+
+def _multipolygon(b: dict) -> Optional[dict]:
+    """Footprint promoted to MultiPolygon so every format gets a single geometry type."""
+    coords = b.get("footprint")
+    if not coords:
+        return None
+    if b.get("geometry_type") == "Polygon":
+        coords = [coords]
+    return {"type": "MultiPolygon", "coordinates": coords}
+
+
+def _chunks(snap: BuildingSnapshot, rows: List[int], chunk_size: int) -> Iterator[List[dict]]:
+    for start in range(0, len(rows), chunk_size):
+        yield [snap.building(i) for i in rows[start:start + chunk_size]]
+
+
+def iter_geojsonseq(snap: BuildingSnapshot, rows: List[int], chunk_size: int) -> Iterator[bytes]:
+    for chunk in _chunks(snap, rows, chunk_size):
+        out = bytearray()
+        for b in chunk:
+            feature = {"type": "Feature", "id": b.get("id"), "geometry": _multipolygon(b), "properties": _properties(b)}
+            out += RECORD_SEPARATOR + json.dumps(feature, separators=(",", ":")).encode("utf-8") + b"\n"
+        yield bytes(out)
+
+
+class _StreamSink:
+    """Write-only file object that hands written bytes back to a generator instead of holding the whole file."""
+
+    def __init__(self):
+        self._parts = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+
+def iter_geoparquet(snap: BuildingSnapshot, rows: List[int], chunk_size: int) -> Iterator[bytes]:
+    """GeoParquet 1.0 with WKB geometry, one row group per chunk."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from shapely.geometry import shape
+    except ImportError as e:
+        raise ExportError(f"GeoParquet export needs pyarrow and shapely installed ({e.name} is missing)")
+
+    fields = [(name, pa.string()) for name in STRING_PROPERTIES]
+    fields += [(name, pa.int64() if name in INTEGER_COLUMNS else pa.float64()) for name in ATTRIBUTE_COLUMNS]
+    fields.append(("geometry", pa.binary()))
+    geo = {
+        "version": "1.0.0",
+        "primary_column": "geometry",
+        # No "crs" key: GeoParquet then means OGC:CRS84 (lng/lat), which is what the footprints are in.
+        "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["MultiPolygon"]}},
+    }
+    schema = pa.schema(fields, metadata={b"geo": json.dumps(geo).encode("utf-8")})
+
+    def generate():
+        sink = _StreamSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for chunk in _chunks(snap, rows, chunk_size):
+                columns = {name: [b.get(name) for b in chunk] for name in STRING_PROPERTIES + ATTRIBUTE_COLUMNS}
+                geoms = [_multipolygon(b) for b in chunk]
+                columns["geometry"] = [shape(g).wkb if g else None for g in geoms]
+                writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    return generate()
+
+
+def write_flatgeobuf(snap: BuildingSnapshot, rows: List[int], path: str, chunk_size: int) -> None:
+    """FlatGeobuf via GDAL; GDAL needs a seekable file, so this always writes to ``path``."""
+    try:
+        import fiona
+    except ImportError:
+        raise ExportError("FlatGeobuf export needs fiona (GDAL) installed")
+
+    schema = {"geometry": "MultiPolygon", "properties": {name: "str" for name in STRING_PROPERTIES}}
+    schema["properties"].update((name, "int" if name in INTEGER_COLUMNS else "float") for name in ATTRIBUTE_COLUMNS)
+    with fiona.open(path, "w", driver="FlatGeobuf", schema=schema, crs="EPSG:4326") as dst:
+        for chunk in _chunks(snap, rows, chunk_size):
+            dst.writerecords(
+                {"geometry": _multipolygon(b), "properties": _properties(b)} for b in chunk
+            )
+
+
+def _iter_file(path: str, remove: bool = False, block_size: int = 1 << 16) -> Iterator[bytes]:
+    try:
+        with open(path, "rb") as fh:
+            while True:
+                block = fh.read(block_size)
+                if not block:
+                    return
+                yield block
+    finally:
+        if remove:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def export_stream(snap: BuildingSnapshot, rows: List[int], fmt: str, chunk_size: int) -> Iterator[bytes]:
+    """Byte chunks of the export. Raises ExportError up front for unknown formats or missing dependencies."""
+    require_format(fmt)
+    if fmt == "geojsonseq":
+        return iter_geojsonseq(snap, rows, chunk_size)
+    if fmt == "geoparquet":
+        return iter_geoparquet(snap, rows, chunk_size)
+    fd, path = tempfile.mkstemp(suffix=FORMATS[fmt][1])
+    os.close(fd)
+    try:
+        write_flatgeobuf(snap, rows, path, chunk_size)
+    except Exception:
+        os.remove(path)
+        raise
+    return _iter_file(path, remove=True)
+
+
+def export_filename(snap: BuildingSnapshot, fmt: str) -> str:
+    return f"buildings-v{snap.version}{FORMATS[fmt][1]}"
+
+
+# --- background jobs ---------------------------------------------------------------------------------------------
+
+def _job_paths(export_dir: str, job_id: str) -> tuple:
+    return os.path.join(export_dir, f"{job_id}.json"), os.path.join(export_dir, f"{job_id}.out")
+
+
+def _write_status(export_dir: str, job_id: str, status: dict) -> None:
+    status_path, _ = _job_paths(export_dir, job_id)
+    tmp = f"{status_path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(status, fh)
+    os.replace(tmp, status_path)
+
+
+def _prune_jobs(export_dir: str) -> None:
+    cutoff = time.time() - JOB_TTL_SECONDS
+    for fname in os.listdir(export_dir):
+        path = os.path.join(export_dir, fname)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _heartbeat(export_dir: str, job_id: str, status: dict, lock: threading.Lock, stop: threading.Event) -> None:
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        with lock:
+            status["heartbeat_unix"] = int(time.time())
+            _write_status(export_dir, job_id, status)
+
+
+def _run_job(export_dir: str, job_id: str, snap: BuildingSnapshot, rows: List[int], fmt: str, chunk_size: int, status: dict) -> None:
+    _, out_path = _job_paths(export_dir, job_id)
+    started = time.monotonic()
+    lock = threading.Lock()
+    stop = threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(export_dir, job_id, status, lock, stop), name=f"export-{job_id[:8]}-hb", daemon=True
+    ).start()
+    try:
+        if fmt == "flatgeobuf":
+            write_flatgeobuf(snap, rows, out_path, chunk_size)
+        else:
+            with open(out_path, "wb") as fh:
+                for block in export_stream(snap, rows, fmt, chunk_size):
+                    fh.write(block)
+    except Exception as e:
+        logger.exception("Export job %s failed", job_id)
+        try:
+            os.remove(out_path)
+        except OSError:
+            pass
+        stop.set()
+        with lock:
+            status.update(status="failed", error=str(e), finished_at_unix=int(time.time()))
+            _write_status(export_dir, job_id, status)
+        return
+    stop.set()
+    with lock:
+        status.update(status="done", bytes=os.path.getsize(out_path), finished_at_unix=int(time.time()))
+        _write_status(export_dir, job_id, status)
+    logger.info("Export job %s: %d buildings as %s in %.2fs", job_id, len(rows), fmt, time.monotonic() - started)
+
+
+def start_export_job(export_dir: str, snap: BuildingSnapshot, rows: List[int], fmt: str, chunk_size: int) -> dict:
+    require_format(fmt)
+    os.makedirs(export_dir, exist_ok=True)
+    _prune_jobs(export_dir)
+    job_id = uuid.uuid4().hex
+    status = {
+        "job_id": job_id,
+        "status": "running",
+        "format": fmt,
+        "count": len(rows),
+        "snapshot_version": snap.version,
+        "filename": export_filename(snap, fmt),
+        "created_at_unix": int(time.time()),
+        # The worker running the job; it refreshes heartbeat_unix until the job finishes.
+        "pid": os.getpid(),
+        "heartbeat_unix": int(time.time()),
+    }
+    _write_status(export_dir, job_id, status)
+    threading.Thread(
+        target=_run_job,
+        args=(export_dir, job_id, snap, rows, fmt, chunk_size, dict(status)),
+        name=f"export-{job_id[:8]}",
+        daemon=True,
+    ).start()
+    return status
+
+
+def job_status(export_dir: str, job_id: str) -> Optional[dict]:
+    if not _JOB_ID.fullmatch(job_id or ""):
+        return None
+    status_path, _ = _job_paths(export_dir, job_id)
+    try:
+        with open(status_path, "r", encoding="utf-8") as fh:
+            status = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    heartbeat = status.get("heartbeat_unix") or status.get("created_at_unix") or 0
+    if status.get("status") == "running" and time.time() - heartbeat > JOB_STALE_SECONDS:
+        # The worker died (restart, OOM kill) mid-export; nothing will ever finish this job.
+        status.update(status="failed", error=f"Export worker (pid {status.get('pid')}) stopped responding")
+    return status
+
+
+def job_output_path(export_dir: str, job_id: str) -> str:
+    return _job_paths(export_dir, job_id)[1]
@@ -11,6 +11,16 @@ logger = logging.getLogger(__name__)
 VALID_ATTRIBUTES = {
     "height", "height_m", "height_ft", "height_feet", "height_meters",
     "zoning", "address",
+    "footprint_area_m2", "perimeter_m", "volume_m3", "est_floors", "floor_area_m2", "bounding_radius_m",
+}
+
+# Words the model (or user) uses for the derived metrics computed at ingest
+ATTRIBUTE_ALIASES = {
+    "area": "footprint_area_m2", "footprint": "footprint_area_m2", "footprint_area": "footprint_area_m2",
+    "floor_area": "floor_area_m2", "gross_floor_area": "floor_area_m2", "gfa": "floor_area_m2",
+    "perimeter": "perimeter_m", "volume": "volume_m3",
+    "floors": "est_floors", "floor": "est_floors", "stories": "est_floors", "storeys": "est_floors",
+    "num_floors": "est_floors", "floor_count": "est_floors", "radius": "bounding_radius_m",
 }
 
 VALID_OPERATORS = {">", ">=", "<", "<=", "=", "==", "!=", "contains"}
@@ -60,8 +70,18 @@ def parse_filter_from_llm_response(text: str) -> Optional[dict]:
         attr = "height_ft"
     if attr == "height_meters" or attr == "meters":
         attr = "height_m"
+    attr = ATTRIBUTE_ALIASES.get(attr, attr)
     if attr not in VALID_ATTRIBUTES and attr not in {"height_ft", "height_m", "zoning", "address"}:
-        if "height" in attr:
+        # Floor area is footprint x floors, so it must win over both the "area" and the "floor" match.
+        if "floor" in attr and "area" in attr:
+            attr = "floor_area_m2"
+        elif "area" in attr:
+            attr = "footprint_area_m2"
+        elif "floor" in attr or "stor" in attr:
+            attr = "est_floors"
+        elif "volume" in attr:
+            attr = "volume_m3"
+        elif "height" in attr:
             attr = "height_ft" if "ft" in attr or "feet" in attr else "height_m"
         elif "zoning" in attr:
             attr = "zoning"
@@ -78,6 +98,23 @@ def _fallback_parse_query(user_query: str) -> Optional[dict]:
     if not user_query or not user_query.strip():
         return None
     q = user_query.strip().lower()
+    # "more than 30 floors" / "over 10 storeys"
+    m = re.search(r"(?:over|more than|above|at least)\s+([\d.]+)\s*(?:floors?|stor(?:e)?ys|stories)", q)
+    if m:
+        op = ">=" if "at least" in m.group(0) else ">"
+        return {"attribute": "est_floors", "operator": op, "value": float(m.group(1))}
+    m = re.search(r"(?:under|less than|fewer than|below)\s+([\d.]+)\s*(?:floors?|stor(?:e)?ys|stories)", q)
+    if m:
+        return {"attribute": "est_floors", "operator": "<", "value": float(m.group(1))}
+    # "footprint over 2000 m²" / "larger than 500 square meters" / "gross floor area over 20,000 m²"
+    area_units = r"(?:m²|m2|sq\.?\s*m\b|sqm|square\s+met(?:er|re)s?)"
+    area_attr = "floor_area_m2" if "floor area" in q or "gfa" in q else "footprint_area_m2"
+    m = re.search(r"(?:over|more than|above|larger than|bigger than)\s+([\d,.]+)\s*" + area_units, q)
+    if m:
+        return {"attribute": area_attr, "operator": ">", "value": float(m.group(1).replace(",", ""))}
+    m = re.search(r"(?:under|less than|below|smaller than)\s+([\d,.]+)\s*" + area_units, q)
+    if m:
+        return {"attribute": area_attr, "operator": "<", "value": float(m.group(1).replace(",", ""))}
     # "over X feet" / "over 100 feet" / "buildings over 100 feet"
     m = re.search(r"over\s+([\d.]+)\s*(?:feet|ft|')", q)
     if m:
@@ -98,7 +135,7 @@ def _fallback_parse_query(user_query: str) -> Optional[dict]:
     return None
 
 
-def query_llm_for_filter(user_query: str, api_token: str, model: str) -> Optional[dict]:
+def query_llm_for_filter(user_query: str, api_token: str, model: str, inference_url: str) -> Optional[dict]:
     if not user_query or not user_query.strip():
         return None
 
@@ -107,17 +144,20 @@ def query_llm_for_filter(user_query: str, api_token: str, model: str) -> Optiona
 
 Query: {user_query}
 
-Valid attributes: height_ft, height_m, zoning, address.
+Valid attributes: height_ft, height_m, zoning, address, footprint_area_m2, perimeter_m, volume_m3, est_floors, floor_area_m2, bounding_radius_m.
 Valid operators: >, >=, <, <=, =, contains.
 
 Examples:
 - "buildings over 100 feet" -> {{"attribute": "height_ft", "operator": ">", "value": 100}}
+- "more than 30 floors" -> {{"attribute": "est_floors", "operator": ">", "value": 30}}
+- "footprint over 2000 square meters" -> {{"attribute": "footprint_area_m2", "operator": ">", "value": 2000}}
+- "gross floor area over 20000 m2" -> {{"attribute": "floor_area_m2", "operator": ">", "value": 20000}}
 - "commercial buildings" -> {{"attribute": "zoning", "operator": "contains", "value": "commercial"}}
 - "show buildings in RC-G zoning" -> {{"attribute": "zoning", "operator": "contains", "value": "RC-G"}}
 
 JSON:"""
 
-        url = f"https://api-inference.huggingface.co/models/{model}"
+        url = f"{inference_url}/models/{model}"
         headers = {
             "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
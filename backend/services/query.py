@@ -0,0 +1,223 @@
+"""Filter, sort and paginate buildings from a snapshot.
+
+Filters run over scalar attributes only and their matches are cached per snapshot version, so following a cursor
+never re-evaluates them. Pages are picked with ``heapq`` partial selection (top-N) instead of a full sort, and
+cursors are keyset positions pinned to the snapshot version they were issued against.
+"""
+import base64
+import hashlib
+import heapq
+import json
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from services.filters import apply_filters
+from services.snapshot import ATTRIBUTE_COLUMNS, BuildingSnapshot
+
+SORTABLE_ATTRIBUTES = set(ATTRIBUTE_COLUMNS) | {"id", "address", "zoning", "stage"}
+SORT_ORDERS = ("asc", "desc")
+MAX_PAGE_SIZE = 5000
+MATCH_CACHE_SIZE = 64
+
+
+class QueryError(ValueError):
+    """Bad sort/order/limit/cursor parameters (HTTP 400)."""
+
+
+class CursorExpired(QueryError):
+    """The cursor's snapshot version is no longer on disk (HTTP 410)."""
+
+
+_match_cache: "OrderedDict[tuple, List[int]]" = OrderedDict()
+_match_lock = threading.Lock()
+
+
+def _filters_key(filters: list, pool: int) -> str:
+    raw = json.dumps([filters or [], pool], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def matching_rows(snap: BuildingSnapshot, filters: list, pool: int) -> List[int]:
+    """Row indices (in snapshot order) among the first ``pool`` rows that pass ``filters``."""
+    key = (snap.path, _filters_key(filters, pool))
+    with _match_lock:
+        rows = _match_cache.get(key)
+        if rows is not None:
+            _match_cache.move_to_end(key)
+            return rows
+    n = min(pool, len(snap))
+    candidates = []
+    for i in range(n):
+        attrs = snap.attributes(i)
+        attrs["_row"] = i
+        candidates.append(attrs)
+    rows = [b["_row"] for b in apply_filters(candidates, filters)]
+    with _match_lock:
+        _match_cache[key] = rows
+        while len(_match_cache) > MATCH_CACHE_SIZE:
+            _match_cache.popitem(last=False)
+    return rows
+
+
+def _sort_key(snap: BuildingSnapshot, sort: Optional[str], order: str):
+    """Key under which the page is the N smallest. Missing values sort last in either order; row index breaks ties."""
+    if sort is None:
+        return lambda i: (i,)
+    numeric = sort in ATTRIBUTE_COLUMNS
+    sign = -1 if order == "desc" else 1
+
+    def key(i):
+        if numeric:
+            v = snap.number(sort, i)
+            return (1, 0.0, i) if v is None else (0, sign * v, i)
+        v = snap.string(sort, i)
+        if v is None:
+            return (1, "", i)
+        # Strings can't be negated; compare code points inverted for descending order.
+        return (0, v if sign > 0 else [-ord(c) for c in v] + [1], i)
+
+    return key
+
+
+def encode_cursor(state: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise QueryError("Invalid cursor") from e
+    if not isinstance(state, dict) or not {"v", "q", "k"} <= state.keys():
+        raise QueryError("Invalid cursor")
+    if not isinstance(state["v"], int) or not isinstance(state["k"], list):
+        raise QueryError("Invalid cursor")
+    return state
+
+
+def _is_int(x) -> bool:
+    return isinstance(x, int) and not isinstance(x, bool)
+
+
+def _check_cursor_key(k: list, sort: Optional[str], order: str) -> None:
+    """Raise QueryError unless ``k`` has the shape ``_sort_key`` produces for this sort/order."""
+    if sort is None:
+        ok = len(k) == 1 and _is_int(k[0])
+    elif len(k) != 3 or k[0] not in (0, 1) or not _is_int(k[0]) or not _is_int(k[2]):
+        ok = False
+    elif sort in ATTRIBUTE_COLUMNS:
+        ok = isinstance(k[1], (int, float)) and not isinstance(k[1], bool)
+    elif k[0] == 0 and order == "desc":
+        ok = isinstance(k[1], list) and all(_is_int(c) for c in k[1])
+    else:
+        ok = isinstance(k[1], str)
+    if not ok:
+        raise QueryError("Invalid cursor")
+
+
+def _parse_sort(body: dict) -> tuple:
+    sort = body.get("sort") or None
+    if sort is not None and (not isinstance(sort, str) or sort not in SORTABLE_ATTRIBUTES):
+        raise QueryError(f"Cannot sort by '{sort}'. Sortable: {', '.join(sorted(SORTABLE_ATTRIBUTES))}")
+    order = str(body.get("order") or "asc").lower()
+    if order not in SORT_ORDERS:
+        raise QueryError("order must be 'asc' or 'desc'")
+    return sort, order
+
+
+def _parse_limit(body: dict, maximum: Optional[int]) -> Optional[int]:
+    limit = body.get("limit")
+    if limit is None:
+        return None
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise QueryError("limit must be an integer")
+    if limit < 1 or (maximum is not None and limit > maximum):
+        raise QueryError(f"limit must be between 1 and {maximum}" if maximum else "limit must be at least 1")
+    return limit
+
+
+def parse_page_params(body: dict) -> dict:
+    """Validate ``sort``, ``order``, ``limit`` and ``cursor`` from a request body."""
+    sort, order = _parse_sort(body)
+    limit = _parse_limit(body, MAX_PAGE_SIZE)
+    cursor = body.get("cursor") or None
+    return {"sort": sort, "order": order, "limit": limit, "cursor": cursor}
+
+
+def parse_export_params(body: dict) -> dict:
+    """Validate ``sort``, ``order`` and ``limit`` for a bulk export: no page-size cap, and no cursors."""
+    if body.get("cursor"):
+        raise QueryError("Exports are not paginated; drop 'cursor' (use 'limit' to cap the row count)")
+    sort, order = _parse_sort(body)
+    return {"sort": sort, "order": order, "limit": _parse_limit(body, None)}
+
+
+def query_snapshot(
+    snap: BuildingSnapshot,
+    filters: list,
+    pool: int,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    limit: Optional[int] = None,
+    cursor: Optional[dict] = None,
+) -> dict:
+    """One page of matching buildings. ``cursor`` is a decoded cursor issued against ``snap``."""
+    query_id = f"{_filters_key(filters, pool)}:{sort}:{order}"
+    after = None
+    if cursor is not None:
+        if cursor["q"] != query_id:
+            raise QueryError("Cursor does not match this query's filters/sort/order")
+        _check_cursor_key(cursor["k"], sort, order)
+        after = _comparable(cursor["k"])
+
+    # One extra row tells whether there is a next page without counting the rest.
+    page = select_rows(snap, filters, pool, sort, order, None if limit is None else limit + 1, after)
+    next_cursor = None
+    if limit is not None and len(page) > limit:
+        del page[limit:]
+        last = _sort_key(snap, sort, order)(page[-1])
+        next_cursor = encode_cursor({"v": snap.version, "q": query_id, "k": list(last)})
+
+    return {
+        "total": len(matching_rows(snap, filters, pool)),
+        "count": len(page),
+        "snapshot_version": snap.version,
+        "next_cursor": next_cursor,
+        "buildings": [snap.building(i) for i in page],
+    }
+
+
+def select_rows(
+    snap: BuildingSnapshot,
+    filters: list,
+    pool: int,
+    sort: Optional[str] = None,
+    order: str = "asc",
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
+) -> List[int]:
+    """Matching row indices in result order, optionally only those sorting after the key ``after``.
+
+    Nothing is materialized, so bulk export uses this directly.
+    """
+    rows = matching_rows(snap, filters, pool)
+    key = _sort_key(snap, sort, order)
+    if after is not None:
+        try:
+            rows = [i for i in rows if _comparable(key(i)) > after]
+        except TypeError as e:
+            raise QueryError("Invalid cursor") from e
+    if limit is not None:
+        return heapq.nsmallest(limit, rows, key=key)
+    if sort is not None:
+        return sorted(rows, key=key)
+    return list(rows)
+
+
+def _comparable(k) -> tuple:
+    # JSON round-trips tuples as lists; normalize so cursor keys compare like freshly computed ones.
+    return tuple(list(x) if isinstance(x, (list, tuple)) else x for x in k)
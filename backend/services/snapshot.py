@@ -0,0 +1,374 @@
+"""Versioned binary snapshot of the normalized building set, memory-mapped read-only so gunicorn workers share one copy.
+
+Layout: magic, JSON header, then 8-byte aligned sections. Numeric attributes are float64 columns (NaN = missing),
+string attributes are utf-8 blobs with int64 offsets and a validity byte per row, and footprints are two flat
+float64 coordinate buffers (lng/lat and local meters) sharing building -> polygon -> ring -> point offsets.
+Publishing writes a new ``buildings-v<N>.snap`` and atomically repoints ``CURRENT``; readers switch on next check.
+"""
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MASIVSNP"
+FORMAT_VERSION = 3
+POINTER_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+TMP_STALE_SECONDS = 3600
+
+ATTRIBUTE_COLUMNS = (
+    "height_m", "height_ft", "rooftop_elev_z", "ground_elev_z",
+    "footprint_area_m2", "perimeter_m", "volume_m3", "est_floors", "floor_area_m2", "bounding_radius_m",
+)
+INTEGER_COLUMNS = {"est_floors"}  # stored as float64, returned as int
+NUMERIC_COLUMNS = ATTRIBUTE_COLUMNS + ("centroid_lng", "centroid_lat")
+STRING_COLUMNS = ("id", "stage", "geometry_type", "address", "zoning")
+
+_PREFIX = struct.Struct("<8sII")  # magic, format version, header length
+
+
+def _snapshot_name(version: int) -> str:
+    return f"buildings-v{version:08d}.snap"
+
+
+def _pad(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def _read_pointer(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, POINTER_FILE), "r", encoding="utf-8") as fh:
+            name = fh.read().strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def _version_of(name: Optional[str]) -> int:
+    if not name:
+        return 0
+    try:
+        return int(name.split("-v", 1)[1].split(".", 1)[0])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _float_or_nan(x) -> float:
+    if x is None:
+        return math.nan
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _polygons_of(b: dict) -> List:
+    """Footprint as a list of polygons (list of rings) regardless of Polygon/MultiPolygon."""
+    coords = b.get("footprint")
+    if not coords:
+        return []
+    if b.get("geometry_type") == "Polygon":
+        return [coords]
+    if b.get("geometry_type") == "MultiPolygon":
+        return coords
+    return []
+
+
+def _encode_buildings(buildings: List[dict]) -> Dict[str, array]:
+    sections: Dict[str, Any] = {}
+    n = len(buildings)
+
+    for name in NUMERIC_COLUMNS:
+        sections[name] = array("d", bytes(8 * n))
+    for i, b in enumerate(buildings):
+        cent = b.get("centroid") or {}
+        sections["centroid_lng"][i] = _float_or_nan(cent.get("lng"))
+        sections["centroid_lat"][i] = _float_or_nan(cent.get("lat"))
+        for name in ATTRIBUTE_COLUMNS:
+            sections[name][i] = _float_or_nan(b.get(name))
+
+    for name in STRING_COLUMNS:
+        blob = bytearray()
+        offsets = array("q", [0])
+        valid = bytearray(n)
+        for i, b in enumerate(buildings):
+            val = b.get(name)
+            if val is not None:
+                blob += str(val).encode("utf-8")
+                valid[i] = 1
+            offsets.append(len(blob))
+        sections[f"{name}.data"] = bytes(blob)
+        sections[f"{name}.offsets"] = offsets
+        sections[f"{name}.valid"] = bytes(valid)
+
+    building_offsets = array("q", [0])
+    poly_offsets = array("q", [0])
+    ring_offsets = array("q", [0])
+    coords = array("d")
+    coords_local = array("d")
+    for b in buildings:
+        polys = _polygons_of(b)
+        local = b.get("footprint_local") or []
+        for pi, poly in enumerate(polys):
+            for ri, ring in enumerate(poly):
+                try:
+                    local_ring = local[pi][ri]
+                except (IndexError, TypeError):
+                    local_ring = None
+                for qi, p in enumerate(ring):
+                    coords.append(float(p[0]))
+                    coords.append(float(p[1]))
+                    if local_ring is not None and qi < len(local_ring):
+                        coords_local.append(float(local_ring[qi][0]))
+                        coords_local.append(float(local_ring[qi][1]))
+                    else:
+                        coords_local.append(math.nan)
+                        coords_local.append(math.nan)
+                ring_offsets.append(len(coords) // 2)
+            poly_offsets.append(len(ring_offsets) - 1)
+        building_offsets.append(len(poly_offsets) - 1)
+    sections["geom.building_offsets"] = building_offsets
+    sections["geom.poly_offsets"] = poly_offsets
+    sections["geom.ring_offsets"] = ring_offsets
+    sections["geom.coords"] = coords
+    sections["geom.coords_local"] = coords_local
+    return sections
+
+
+def write_snapshot(directory: str, buildings: List[dict], meta: Optional[dict] = None) -> str:
+    """Write a new snapshot version and atomically make it current. Returns the snapshot path."""
+    os.makedirs(directory, exist_ok=True)
+    version = _version_of(_read_pointer(directory)) + 1
+    name = _snapshot_name(version)
+    sections = _encode_buildings(buildings)
+
+    layout = {}  # section offsets are relative to the end of the header
+    offset = 0
+    for key, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        size = len(data) * (data.itemsize if isinstance(data, array) else 1)
+        layout[key] = [offset, size, typecode]
+        offset += size + _pad(size)
+    header = {
+        "version": version,
+        "created_at_unix": int(time.time()),
+        "count": len(buildings),
+        "byteorder": sys.byteorder,
+        "meta": meta or {},
+        "sections": layout,
+    }
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * _pad(_PREFIX.size + len(header_bytes))
+    base = _PREFIX.size + len(header_bytes)
+
+    path = os.path.join(directory, name)
+    tmp = f"{path}.tmp.{os.getpid()}"
+    with open(tmp, "wb") as fh:
+        fh.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        fh.write(header_bytes)
+        for key, data in sections.items():
+            fh.write(data.tobytes() if isinstance(data, array) else data)
+            fh.write(b"\0" * _pad(layout[key][1]))
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, path)
+    _publish_pointer(directory, name)
+    _prune_old(directory, version)
+    logger.info("Published building snapshot v%d (%d buildings, %d bytes)", version, len(buildings), base + offset)
+    return path
+
+
+def _publish_pointer(directory: str, name: str) -> None:
+    pointer = os.path.join(directory, POINTER_FILE)
+    tmp = f"{pointer}.tmp.{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(name)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp, pointer)
+
+
+def _prune_old(directory: str, current_version: int) -> None:
+    now = time.time()
+    for fname in os.listdir(directory):
+        path = os.path.join(directory, fname)
+        if ".tmp." in fname:
+            # Left behind by a writer that crashed mid-publish; a live writer's temp file is never this old.
+            stale = _mtime(path) < now - TMP_STALE_SECONDS
+        elif fname.startswith("buildings-v") and fname.endswith(".snap"):
+            stale = _version_of(fname) <= current_version - KEEP_VERSIONS
+        else:
+            continue
+        if stale:
+            try:
+                os.remove(path)
+            except OSError:
+                # Still mapped by another process on platforms that forbid unlinking; retried next publish.
+                pass
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return time.time()
+
+
+class BuildingSnapshot:
+    """Read-only, zero-copy view over one snapshot file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, fmt, header_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"Not a building snapshot (format {fmt}): {path}")
+        header = json.loads(bytes(self._mm[_PREFIX.size:_PREFIX.size + header_len]))
+        if header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"Snapshot byte order {header.get('byteorder')} does not match host: {path}")
+        self.version = header["version"]
+        self.created_at_unix = header["created_at_unix"]
+        self.count = header["count"]
+        self.meta = header.get("meta") or {}
+
+        base = _PREFIX.size + header_len
+        buf = memoryview(self._mm)
+        self._sections = {}
+        for key, (offset, size, typecode) in header["sections"].items():
+            view = buf[base + offset:base + offset + size]
+            self._sections[key] = view.cast(typecode) if typecode != "B" else view
+        self._index: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def column(self, name: str) -> memoryview:
+        """float64 column view (NaN = missing) for a numeric attribute."""
+        return self._sections[name]
+
+    def number(self, name: str, i: int) -> Optional[float]:
+        v = self._sections[name][i]
+        return None if math.isnan(v) else v
+
+    def string(self, name: str, i: int) -> Optional[str]:
+        if not self._sections[f"{name}.valid"][i]:
+            return None
+        offsets = self._sections[f"{name}.offsets"]
+        return bytes(self._sections[f"{name}.data"][offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def _footprints(self, i: int):
+        bo = self._sections["geom.building_offsets"]
+        po = self._sections["geom.poly_offsets"]
+        ro = self._sections["geom.ring_offsets"]
+        coords = self._sections["geom.coords"]
+        local = self._sections["geom.coords_local"]
+        polys, polys_local = [], []
+        for pi in range(bo[i], bo[i + 1]):
+            rings, rings_local = [], []
+            for ri in range(po[pi], po[pi + 1]):
+                lo, hi = 2 * ro[ri], 2 * ro[ri + 1]
+                xs, ys = coords[lo:hi:2], coords[lo + 1:hi:2]
+                lxs, lys = local[lo:hi:2], local[lo + 1:hi:2]
+                rings.append([[x, y] for x, y in zip(xs, ys)])
+                rings_local.append([[x, y] for x, y in zip(lxs, lys)])
+            polys.append(rings)
+            polys_local.append(rings_local)
+        return polys, polys_local
+
+    def attributes(self, i: int) -> dict:
+        """Scalar attributes of row ``i`` (no footprints): enough to filter and sort without materializing geometry."""
+        out = {name: self.string(name, i) for name in STRING_COLUMNS}
+        out.update((name, self.number(name, i)) for name in ATTRIBUTE_COLUMNS)
+        for name in INTEGER_COLUMNS:
+            if out[name] is not None:
+                out[name] = int(out[name])
+        return out
+
+    def building(self, i: int) -> dict:
+        """Materialize row ``i`` in the same shape ``normalize_feature`` returns."""
+        b = self.attributes(i)
+        polys, polys_local = self._footprints(i)
+        if not polys:
+            b["footprint"] = b["footprint_local"] = None
+        else:
+            b["footprint"] = polys[0] if b["geometry_type"] == "Polygon" else polys
+            b["footprint_local"] = polys_local
+        lng = self.number("centroid_lng", i)
+        lat = self.number("centroid_lat", i)
+        b["centroid"] = {"lng": lng, "lat": lat} if lng is not None and lat is not None else None
+        return b
+
+    def buildings(self, limit: Optional[int] = None) -> Iterator[dict]:
+        n = self.count if limit is None else max(0, min(limit, self.count))
+        for i in range(n):
+            yield self.building(i)
+
+    def index_of(self, building_id: str) -> Optional[int]:
+        if self._index is None:
+            self._index = {}
+            for i in range(self.count):
+                bid = self.string("id", i)
+                if bid is not None:
+                    self._index.setdefault(bid, i)
+        return self._index.get(str(building_id))
+
+
+def open_snapshot(directory: str) -> Optional[BuildingSnapshot]:
+    name = _read_pointer(directory)
+    if not name:
+        return None
+    try:
+        return BuildingSnapshot(os.path.join(directory, name))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not open building snapshot %s: %s", name, e)
+        return None
+
+
+def open_version(directory: str, version: int) -> Optional[BuildingSnapshot]:
+    """A specific (possibly superseded) version, while it is still on disk. Used to keep cursors stable."""
+    path = os.path.join(directory, _snapshot_name(version))
+    with _lock:
+        snap = _versions.get(path)
+        if snap is None:
+            try:
+                snap = BuildingSnapshot(path)
+            except (OSError, ValueError):
+                return None
+            _versions[path] = snap
+            while len(_versions) > KEEP_VERSIONS:
+                _versions.pop(next(iter(_versions)))
+        return snap
+
+
+_lock = threading.Lock()
+_current: Dict[str, Any] = {}
+_versions: Dict[str, BuildingSnapshot] = {}
+
+
+def current_snapshot(directory: str, check_interval: float = 1.0) -> Optional[BuildingSnapshot]:
+    """Per-process cached snapshot; re-reads ``CURRENT`` at most every ``check_interval`` seconds."""
+    now = time.monotonic()
+    snap = _current.get(directory)
+    if snap is not None and now - _current.get(f"{directory}:checked", 0.0) < check_interval:
+        return snap
+    with _lock:
+        _current[f"{directory}:checked"] = now
+        name = _read_pointer(directory)
+        snap = _current.get(directory)
+        if name and (snap is None or os.path.basename(snap.path) != name):
+            fresh = open_snapshot(directory)
+            if fresh is not None:
+                # The old mapping is released once in-flight requests drop their references.
+                _current[directory] = fresh
+                snap = fresh
+        return snap
@@ -0,0 +1,264 @@
+"""Shared building store: serves the normalized set from the memory-mapped snapshot, refreshing it from upstream when stale."""
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from services.cityData import (
+    DOWNTOWN_ORIGIN_LAT,
+    DOWNTOWN_ORIGIN_LNG,
+    _enrich_buildings_with_zoning,
+    _in_bbox,
+    fetch_buildings,
+    fetch_changed_rows,
+    fetch_high_water_mark,
+    fetch_live_struct_ids,
+    get_zoning_index,
+    normalize_row,
+)
+from services.snapshot import BuildingSnapshot, current_snapshot, open_version, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+LOCK_FILE = "refresh.lock"
+# How long a caller waits for another worker's first snapshot. Requests give up quickly (503) so gunicorn's worker
+# timeout never fires on them; the warm-up thread, which no timeout watches, waits as long as a full fetch can take.
+REQUEST_SNAPSHOT_WAIT_SECONDS = 5
+WARMUP_SNAPSHOT_WAIT_SECONDS = 300
+WAIT_POLL_SECONDS = 0.25
+REFRESH_RETRY_SECONDS = 60
+
+_refresh_thread: Optional[threading.Thread] = None
+_refresh_started = 0.0
+_refresh_thread_lock = threading.Lock()
+
+
+def get_downtown_bbox(cfg):
+    return {
+        "top": cfg.get("DOWNTOWN_TOP"),
+        "bottom": cfg.get("DOWNTOWN_BOTTOM"),
+        "left": cfg.get("DOWNTOWN_LEFT"),
+        "right": cfg.get("DOWNTOWN_RIGHT"),
+    }
+
+
+@contextmanager
+def _refresh_lock(directory: str):
+    """Cross-process lock so only one worker refreshes at a time. Yields False if another holds it.
+
+    The lock is an OS file lock on an open descriptor, so it is released when the holder exits or crashes;
+    the lock file itself is never removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    fd = os.open(os.path.join(directory, LOCK_FILE), os.O_CREAT | os.O_RDWR)
+    try:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def _full_rebuild(cfg) -> None:
+    directory = cfg["SNAPSHOT_DIR"]
+    # Taken before the fetch: rows changed mid-fetch are re-applied by the next sync (upserts are idempotent).
+    try:
+        high_water_mark = fetch_high_water_mark(cfg["SOCRATA_BASE_URL"], cfg["HEIGHT_DATA"], cfg.get("DATASET_TOKEN", ""))
+    except Exception as e:
+        logger.warning("High-water mark fetch failed; next refresh will be a full rebuild: %s", e)
+        high_water_mark = None
+    payload = fetch_buildings(
+        base_url=cfg["SOCRATA_BASE_URL"],
+        dataset_id=cfg["HEIGHT_DATA"],
+        limit=cfg["SNAPSHOT_LIMIT"],
+        app_token=cfg.get("DATASET_TOKEN", ""),
+        bbox=get_downtown_bbox(cfg),
+        zoning_dataset_id=cfg.get("ZONING_DATASET"),
+    )
+    write_snapshot(
+        directory,
+        payload["buildings"],
+        meta={"fetched_at_unix": payload["fetched_at_unix"], "high_water_mark": high_water_mark},
+    )
+
+
+def _incremental_sync(cfg, snap: BuildingSnapshot) -> None:
+    """Apply rows changed since the snapshot's high-water mark as upserts/deletes keyed by ``struct_id``."""
+    since = snap.meta["high_water_mark"]
+    app_token = cfg.get("DATASET_TOKEN", "")
+    bbox = get_downtown_bbox(cfg)
+    rows = fetch_changed_rows(cfg["SOCRATA_BASE_URL"], cfg["HEIGHT_DATA"], since, bbox, app_token)
+
+    high_water_mark = since
+    changed = {}  # struct_id -> building, or None when it left the bbox / lost its geometry
+    for row in rows:
+        high_water_mark = max(high_water_mark, row.get(":updated_at") or high_water_mark)
+        struct_id = row.get("struct_id")
+        if struct_id is None:
+            continue
+        b = normalize_row(row)
+        changed[str(struct_id)] = b if b is not None and _in_bbox(b.get("centroid"), bbox) else None
+
+    live_ids = fetch_live_struct_ids(cfg["SOCRATA_BASE_URL"], cfg["HEIGHT_DATA"], bbox, app_token)
+    if not live_ids:
+        logger.warning("Live struct_id listing came back empty; skipping delete detection")
+    buildings = []
+    seen = set()
+    deleted = 0
+    for b in snap.buildings():
+        struct_id = b.get("id")
+        if struct_id in changed:
+            b = changed[struct_id]
+            seen.add(struct_id)
+        elif live_ids and struct_id is not None and struct_id not in live_ids:
+            b = None
+        if b is None:
+            deleted += 1
+            continue
+        buildings.append(b)
+    inserted = [b for sid, b in changed.items() if b is not None and sid not in seen]
+    buildings.extend(inserted)
+    limit = cfg["SNAPSHOT_LIMIT"]
+    if len(buildings) > limit:
+        # Same cap as a full rebuild; the newest inserts are the ones left out until a rebuild or deletes make room.
+        logger.warning("Incremental sync produced %d buildings; keeping the first %d (SNAPSHOT_LIMIT)", len(buildings), limit)
+        del buildings[limit:]
+
+    upserted = [b for b in changed.values() if b is not None]
+    zoning_dataset_id = cfg.get("ZONING_DATASET")
+    if zoning_dataset_id and upserted:
+        zoning_index = get_zoning_index(cfg["SOCRATA_BASE_URL"], zoning_dataset_id, bbox, app_token)
+        if zoning_index is not None:
+            _enrich_buildings_with_zoning(upserted, zoning_index)
+
+    write_snapshot(
+        cfg["SNAPSHOT_DIR"],
+        buildings,
+        meta={"fetched_at_unix": int(time.time()), "high_water_mark": high_water_mark},
+    )
+    logger.info(
+        "Incremental sync since %s: %d changed rows, %d upserted (%d new), %d removed",
+        since, len(rows), len(upserted), len(inserted), deleted,
+    )
+
+
+def refresh_snapshot(cfg, full: bool = False) -> Optional[BuildingSnapshot]:
+    """Publish a new snapshot version, incrementally from the last high-water mark unless ``full`` or none is recorded.
+
+    Returns None if another worker is already refreshing.
+    """
+    directory = cfg["SNAPSHOT_DIR"]
+    with _refresh_lock(directory) as acquired:
+        if not acquired:
+            return None
+        started = time.monotonic()
+        snap = current_snapshot(directory, check_interval=0)
+        incremental = (
+            not full
+            and cfg.get("SNAPSHOT_SYNC", "incremental") == "incremental"
+            and snap is not None
+            and snap.meta.get("high_water_mark")
+        )
+        if incremental:
+            _incremental_sync(cfg, snap)
+        else:
+            _full_rebuild(cfg)
+        logger.info(
+            "Snapshot %s took %.2fs", "sync" if incremental else "full rebuild", time.monotonic() - started
+        )
+    return current_snapshot(directory, check_interval=0)
+
+
+def _refresh_in_background(cfg) -> None:
+    global _refresh_thread, _refresh_started
+    with _refresh_thread_lock:
+        if _refresh_thread is not None and _refresh_thread.is_alive():
+            return
+        if time.monotonic() - _refresh_started < REFRESH_RETRY_SECONDS:
+            return
+        _refresh_started = time.monotonic()
+
+        def run():
+            try:
+                refresh_snapshot(cfg)
+            except Exception:
+                logger.exception("Background snapshot refresh failed")
+
+        _refresh_thread = threading.Thread(target=run, name="snapshot-refresh", daemon=True)
+        _refresh_thread.start()
+
+
+def get_snapshot(cfg, wait: float = REQUEST_SNAPSHOT_WAIT_SECONDS) -> BuildingSnapshot:
+    """Current snapshot for this worker. A stale one is served while it refreshes in the background;
+    only when none exists yet does the caller block on the upstream fetch, or wait up to ``wait`` seconds
+    for the worker that is already fetching."""
+    directory = cfg["SNAPSHOT_DIR"]
+    snap = current_snapshot(directory)
+    if snap is not None:
+        if time.time() - snap.created_at_unix > cfg.get("SNAPSHOT_MAX_AGE", 3600):
+            _refresh_in_background(cfg)
+        return snap
+
+    fresh = refresh_snapshot(cfg)
+    if fresh is not None:
+        return fresh
+
+    # Another worker is building the first snapshot; wait for it to publish.
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_SECONDS)
+        snap = current_snapshot(directory, check_interval=0)
+        if snap is not None:
+            return snap
+    raise RuntimeError("Building snapshot is still being fetched by another worker; retry shortly")
+
+
+def buildings_payload(snap: BuildingSnapshot, limit: Optional[int] = None) -> dict:
+    """Same shape as ``fetch_buildings`` returns, materialized from the snapshot."""
+    buildings = list(snap.buildings(limit))
+    return {
+        "count": len(buildings),
+        "fetched_at_unix": snap.meta.get("fetched_at_unix", snap.created_at_unix),
+        "origin": {"lat": DOWNTOWN_ORIGIN_LAT, "lng": DOWNTOWN_ORIGIN_LNG},
+        "snapshot_version": snap.version,
+        "buildings": buildings,
+    }
+
+
+def get_buildings(cfg, limit: Optional[int] = None) -> dict:
+    return buildings_payload(get_snapshot(cfg), limit)
+
+
+def get_building(cfg, building_id: str) -> Optional[dict]:
+    snap = get_snapshot(cfg)
+    i = snap.index_of(building_id)
+    return snap.building(i) if i is not None else None
+
+
+def get_snapshot_version(cfg, version: int) -> Optional[BuildingSnapshot]:
+    """The snapshot a cursor was issued against: the current one, or a superseded version still on disk."""
+    snap = get_snapshot(cfg)
+    if snap.version == version:
+        return snap
+    return open_version(cfg["SNAPSHOT_DIR"], version)
@@ -0,0 +1,75 @@
+"""Background warm-up: map (or build) the building snapshot and zoning index so the first request is fast."""
+import logging
+import threading
+import time
+from typing import Optional
+
+from services.cityData import get_zoning_index
+from services.store import REFRESH_RETRY_SECONDS, WARMUP_SNAPSHOT_WAIT_SECONDS, get_downtown_bbox, get_snapshot
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_state = {
+    "status": "cold",  # cold -> warming -> ready | failed
+    "started_at_unix": None,
+    "finished_at_unix": None,
+    "snapshot_version": None,
+    "timings": {},
+    "error": None,
+}
+_thread: Optional[threading.Thread] = None
+
+
+def _set(**kwargs) -> None:
+    with _lock:
+        _state.update(kwargs)
+
+
+def warmup_state() -> dict:
+    with _lock:
+        return dict(_state, timings=dict(_state["timings"]))
+
+
+def is_ready() -> bool:
+    return warmup_state()["status"] == "ready"
+
+
+def _warm(cfg) -> None:
+    timings = {}
+    try:
+        started = time.monotonic()
+        snap = get_snapshot(cfg, wait=WARMUP_SNAPSHOT_WAIT_SECONDS)
+        timings["snapshot_s"] = round(time.monotonic() - started, 3)
+        _set(snapshot_version=snap.version)
+
+        if cfg.get("ZONING_DATASET"):
+            started = time.monotonic()
+            get_zoning_index(
+                cfg["SOCRATA_BASE_URL"], cfg["ZONING_DATASET"], get_downtown_bbox(cfg), cfg.get("DATASET_TOKEN", "")
+            )
+            timings["zoning_index_s"] = round(time.monotonic() - started, 3)
+    except Exception as e:
+        logger.exception("Warm-up failed")
+        _set(status="failed", error=str(e), timings=timings, finished_at_unix=int(time.time()))
+        return
+    _set(status="ready", timings=timings, finished_at_unix=int(time.time()))
+    logger.info("Warm-up finished: %s", timings)
+
+
+def start_warmup(cfg) -> Optional[threading.Thread]:
+    """Start warming in a daemon thread (once per process). ``cfg`` is read from the thread, not the request context.
+
+    After a failure, retries wait REFRESH_RETRY_SECONDS so readiness probes don't each start an upstream rebuild.
+    """
+    global _thread
+    with _lock:
+        # A "warming" status without a live thread was inherited across fork (gunicorn --preload); start over.
+        if _state["status"] == "ready" or (_thread is not None and _thread.is_alive()):
+            return _thread
+        if _state["status"] == "failed" and time.time() - (_state["finished_at_unix"] or 0) < REFRESH_RETRY_SECONDS:
+            return _thread
+        _state.update(status="warming", started_at_unix=int(time.time()), error=None)
+        _thread = threading.Thread(target=_warm, args=(cfg,), name="warmup", daemon=True)
+        _thread.start()
+        return _thread
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the app's modules the same way app.py does, as top-level packages under backend/.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Config reads the environment once at import; keep the app's sqlite db and data directories out of the tree.
+_scratch = tempfile.mkdtemp(prefix="masiv-tests-")
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_scratch, "test.db").replace("\\", "/")
+os.environ["SNAPSHOT_DIR"] = os.path.join(_scratch, "snapshots")
+os.environ["EXPORT_DIR"] = os.path.join(_scratch, "exports")
+
+SQUARE = [[[-114.07, 51.045], [-114.069, 51.045], [-114.069, 51.046], [-114.07, 51.045]]]
+
+
+def make_buildings(count):
+    return [
+        {
+            "id": f"B{i}",
+            "geometry_type": "Polygon",
+            "footprint": SQUARE,
+            "footprint_local": [[[[0.0, 0.0], [10.0, 0.0], [10.0, 10.0], [0.0, 0.0]]]],
+            "height_m": float(i),
+            "zoning": "CC-X" if i % 2 else "R-C1",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def app(tmp_path):
+    """The Flask app with its snapshot and export directories pointed at ``tmp_path``."""
+    from app import app as flask_app
+
+    flask_app.config.update(
+        TESTING=True,
+        SNAPSHOT_DIR=str(tmp_path / "snapshots"),
+        EXPORT_DIR=str(tmp_path / "exports"),
+        HF_API_TOKEN="test-token",
+    )
+    return flask_app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
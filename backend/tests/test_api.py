@@ -0,0 +1,38 @@
+import time
+
+from conftest import make_buildings
+from routes import api
+from services.snapshot import write_snapshot
+
+
+def test_query_pages_reuse_first_page_filters(app, client, monkeypatch):
+    write_snapshot(app.config["SNAPSHOT_DIR"], make_buildings(30), {"fetched_at_unix": int(time.time())})
+    calls = []
+
+    def fake_llm(query, api_token, model, inference_url):
+        calls.append(query)
+        return {"attribute": "zoning", "operator": "contains", "value": "CC"}
+
+    monkeypatch.setattr(api, "query_llm_for_filter", fake_llm)
+
+    body = {"query": "commercial buildings", "sort": "height_m", "order": "desc", "limit": 4}
+    page = client.post("/api/query", json=body).get_json()
+    seen = [b["id"] for b in page["buildings"]]
+    while page["next_cursor"]:
+        resp = client.post("/api/query", json=dict(body, cursor=page["next_cursor"], filters=page["filters"]))
+        assert resp.status_code == 200
+        page = resp.get_json()
+        seen += [b["id"] for b in page["buildings"]]
+
+    assert calls == ["commercial buildings"]
+    assert seen == [f"B{i}" for i in range(29, 0, -2)]
+    assert page["total"] == 15
+
+
+def test_query_cursor_without_filters_is_rejected(app, client, monkeypatch):
+    write_snapshot(app.config["SNAPSHOT_DIR"], make_buildings(10), {"fetched_at_unix": int(time.time())})
+    monkeypatch.setattr(api, "query_llm_for_filter", lambda *args: None)
+    first = client.post("/api/query", json={"query": "anything", "limit": 3}).get_json()
+
+    resp = client.post("/api/query", json={"query": "anything", "limit": 3, "cursor": first["next_cursor"]})
+    assert resp.status_code == 400
@@ -0,0 +1,120 @@
+import importlib.util
+import json
+import os
+import time
+
+import pytest
+
+from conftest import make_buildings
+from services import export
+from services.export import RECORD_SEPARATOR, iter_geojsonseq
+from services.snapshot import current_snapshot, write_snapshot
+
+
+@pytest.fixture
+def snapshot_dir(app):
+    directory = app.config["SNAPSHOT_DIR"]
+    write_snapshot(directory, make_buildings(30), {"fetched_at_unix": int(time.time())})
+    return directory
+
+
+def test_geojsonseq_framing(snapshot_dir):
+    snap = current_snapshot(snapshot_dir)
+    data = b"".join(iter_geojsonseq(snap, [0, 1, 2], chunk_size=2))
+
+    assert data.startswith(RECORD_SEPARATOR) and data.endswith(b"\n")
+    records = data.split(RECORD_SEPARATOR)[1:]
+    assert len(records) == 3
+    for i, record in enumerate(records):
+        assert record.endswith(b"\n") and record.count(b"\n") == 1
+        feature = json.loads(record)
+        assert feature["id"] == f"B{i}"
+        # Polygon footprints are promoted so every feature has the same geometry type.
+        assert feature["geometry"]["type"] == "MultiPolygon"
+        assert feature["geometry"]["coordinates"] == [snap.building(i)["footprint"]]
+        assert feature["properties"]["height_m"] == float(i)
+
+
+def test_unknown_format_is_400(client, snapshot_dir):
+    resp = client.post("/api/export", json={"format": "shapefile"})
+    assert resp.status_code == 400
+    assert "Unknown export format" in resp.get_json()["error"]
+
+
+def test_missing_optional_package_is_400(client, snapshot_dir, monkeypatch):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: None if name == "pyarrow" else find_spec(name, *a))
+
+    resp = client.post("/api/export", json={"format": "geoparquet"})
+    assert resp.status_code == 400
+    assert "pyarrow" in resp.get_json()["error"]
+
+
+def test_streamed_export_limits(app, client, snapshot_dir):
+    app.config["EXPORT_SYNC_MAX_ROWS"] = 10
+    assert client.post("/api/export", json={"limit": 10}).status_code == 200
+    assert client.post("/api/export", json={}).status_code == 400
+    if importlib.util.find_spec("fiona") is not None:
+        assert client.post("/api/export", json={"format": "flatgeobuf", "limit": 1}).status_code == 400
+
+
+def _wait_for_job(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = client.get(f"/api/export/{job_id}").get_json()
+        if status["status"] != "running":
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"export job {job_id} still running")
+
+
+def test_job_lifecycle(app, client, snapshot_dir):
+    resp = client.post("/api/export", json={"async": True, "sort": "height_m", "order": "desc", "limit": 5})
+    assert resp.status_code == 202
+    job = resp.get_json()
+    assert job["status"] == "running" and job["pid"] == os.getpid()
+
+    status = _wait_for_job(client, job["job_id"])
+    assert status["status"] == "done" and status["count"] == 5
+
+    resp = client.get(job["download_url"])
+    assert resp.status_code == 200
+    ids = [json.loads(r)["id"] for r in resp.data.split(RECORD_SEPARATOR)[1:]]
+    resp.close()
+    assert ids == ["B29", "B28", "B27", "B26", "B25"]
+
+    os.remove(export.job_output_path(app.config["EXPORT_DIR"], job["job_id"]))
+    assert client.get(job["download_url"]).status_code == 410
+
+
+def test_stale_heartbeat_reports_failed(app, client, snapshot_dir):
+    job = client.post("/api/export", json={"async": True}).get_json()
+    _wait_for_job(client, job["job_id"])
+
+    # What a worker killed mid-export leaves behind: still "running", heartbeat long gone.
+    status_path = os.path.join(app.config["EXPORT_DIR"], f"{job['job_id']}.json")
+    with open(status_path, "r", encoding="utf-8") as fh:
+        status = json.load(fh)
+    status.update(status="running", heartbeat_unix=int(time.time()) - export.JOB_STALE_SECONDS - 5)
+    with open(status_path, "w", encoding="utf-8") as fh:
+        json.dump(status, fh)
+
+    status = client.get(f"/api/export/{job['job_id']}").get_json()
+    assert status["status"] == "failed"
+    assert str(os.getpid()) in status["error"]
+    assert client.get(job["download_url"]).status_code == 409
+
+
+def test_geoparquet_row_groups_and_geo_metadata(snapshot_dir):
+    pq = pytest.importorskip("pyarrow.parquet")
+    pa = pytest.importorskip("pyarrow")
+    snap = current_snapshot(snapshot_dir)
+    rows = list(range(len(snap))) * 40  # 1200 rows
+
+    data = b"".join(export.iter_geoparquet(snap, rows, chunk_size=500))
+    parquet = pq.ParquetFile(pa.BufferReader(data))
+    assert parquet.metadata.num_rows == 1200
+    assert parquet.metadata.num_row_groups == 3
+    geo = json.loads(parquet.schema_arrow.metadata[b"geo"])
+    assert geo["primary_column"] == "geometry"
+    assert geo["columns"]["geometry"] == {"encoding": "WKB", "geometry_types": ["MultiPolygon"]}
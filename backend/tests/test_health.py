@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from conftest import make_buildings
+from services import warmup
+from services.snapshot import write_snapshot
+
+
+@pytest.fixture
+def cold_worker(monkeypatch):
+    monkeypatch.setattr(warmup, "_state", dict(warmup._state, status="cold", finished_at_unix=None, error=None))
+    monkeypatch.setattr(warmup, "_thread", None)
+
+
+def _join_warmup():
+    if warmup._thread is not None:
+        warmup._thread.join(timeout=10)
+
+
+def test_live_and_ready_split(app, client, cold_worker):
+    write_snapshot(app.config["SNAPSHOT_DIR"], make_buildings(3), {"fetched_at_unix": int(time.time())})
+
+    assert client.get("/api/health/live").status_code == 200
+    resp = client.get("/api/health/ready")
+    assert resp.status_code == 503  # cold: this probe starts the warm-up
+    assert resp.get_json()["status"] in ("cold", "warming")
+
+    _join_warmup()
+    resp = client.get("/api/health/ready")
+    assert resp.status_code == 200
+    assert resp.get_json()["snapshot_version"] == 1
+    assert client.get("/api/health/live").status_code == 200
+
+
+def test_failed_warmup_is_not_restarted_by_every_probe(app, client, cold_worker, monkeypatch):
+    attempts = []
+
+    def failing_get_snapshot(cfg, wait=None):
+        attempts.append(wait)
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(warmup, "get_snapshot", failing_get_snapshot)
+    client.get("/api/health/ready")
+    _join_warmup()
+    assert warmup.warmup_state()["status"] == "failed"
+
+    for _ in range(5):
+        assert client.get("/api/health/ready").status_code == 503
+    _join_warmup()
+    assert len(attempts) == 1
+
+    # Once the retry interval has passed, the next probe tries again.
+    monkeypatch.setitem(warmup._state, "finished_at_unix", int(time.time()) - warmup.REFRESH_RETRY_SECONDS - 1)
+    client.get("/api/health/ready")
+    _join_warmup()
+    assert len(attempts) == 2
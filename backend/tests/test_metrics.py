@@ -0,0 +1,63 @@
+import pytest
+
+from services.cityData import FLOOR_HEIGHT_M, footprint_metrics, lng_lat_to_local_meters
+from services.llm import _fallback_parse_query
+
+CENTROID = {"lng": -114.065, "lat": 51.046}
+
+
+def _rect(x0, z0, x1, z1):
+    return [[x0, z0], [x1, z0], [x1, z1], [x0, z1], [x0, z0]]
+
+
+def _rect_with_hole():
+    """20 m x 10 m rectangle centred on CENTROID with a 4 m x 5 m courtyard."""
+    cx, cz = lng_lat_to_local_meters(CENTROID["lng"], CENTROID["lat"])
+    outer = _rect(cx - 10, cz - 5, cx + 10, cz + 5)
+    hole = _rect(cx - 2, cz - 2.5, cx + 2, cz + 2.5)
+    return [[outer, hole]]
+
+
+def test_rectangle_with_hole():
+    m = footprint_metrics(_rect_with_hole(), CENTROID, 35.0)
+    assert m["footprint_area_m2"] == pytest.approx(200.0 - 20.0)
+    assert m["perimeter_m"] == pytest.approx(60.0)  # outer ring only
+    assert m["volume_m3"] == pytest.approx(180.0 * 35.0)
+    assert m["est_floors"] == 10
+    assert m["floor_area_m2"] == pytest.approx(180.0 * 10)
+    assert m["bounding_radius_m"] == pytest.approx((10.0 ** 2 + 5.0 ** 2) ** 0.5)
+
+
+@pytest.mark.parametrize("height_m, floors", [
+    (0.0, 0),
+    (1.0, 1),  # anything above ground is at least one floor
+    (3.4 * FLOOR_HEIGHT_M, 3),
+    (3.6 * FLOOR_HEIGHT_M, 4),
+])
+def test_est_floors_rounding(height_m, floors):
+    assert footprint_metrics(_rect_with_hole(), CENTROID, height_m)["est_floors"] == floors
+
+
+def test_zero_height_has_no_volume_or_floor_area():
+    m = footprint_metrics(_rect_with_hole(), CENTROID, 0.0)
+    assert m["volume_m3"] == 0.0 and m["floor_area_m2"] == 0.0
+
+
+def test_missing_inputs():
+    m = footprint_metrics(_rect_with_hole(), None, None)
+    assert m["footprint_area_m2"] == pytest.approx(180.0)
+    assert m["bounding_radius_m"] is None
+    assert m["volume_m3"] is None and m["est_floors"] is None and m["floor_area_m2"] is None
+    assert all(v is None for v in footprint_metrics(None, CENTROID, 10.0).values())
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("more than 30 floors", {"attribute": "est_floors", "operator": ">", "value": 30.0}),
+    ("at least 10 storeys", {"attribute": "est_floors", "operator": ">=", "value": 10.0}),
+    ("under 5 stories", {"attribute": "est_floors", "operator": "<", "value": 5.0}),
+    ("footprint over 2,000 m²", {"attribute": "footprint_area_m2", "operator": ">", "value": 2000.0}),
+    ("smaller than 150 square metres", {"attribute": "footprint_area_m2", "operator": "<", "value": 150.0}),
+    ("gross floor area over 20,000 m2", {"attribute": "floor_area_m2", "operator": ">", "value": 20000.0}),
+])
+def test_fallback_parse_query_metrics(query, expected):
+    assert _fallback_parse_query(query) == expected
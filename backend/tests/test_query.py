@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from services.query import QueryError, decode_cursor, parse_export_params, parse_page_params, query_snapshot
+from services.snapshot import current_snapshot, write_snapshot
+
+SQUARE = [[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]]
+
+
+def _buildings(count):
+    rng = random.Random(1)
+    return [
+        {
+            "id": f"B{i}",
+            "geometry_type": "Polygon",
+            "footprint": SQUARE,
+            "footprint_local": [SQUARE],
+            "height_m": None if i % 7 == 0 else rng.choice([10.0, 20.0, 30.0, 40.5]),
+            "zoning": rng.choice(["CC-X", "R-C1", None]),
+        }
+        for i in range(count)
+    ]
+
+
+def test_cursor_walk_matches_full_sorted_result(tmp_path):
+    buildings = _buildings(200)
+    write_snapshot(str(tmp_path), buildings)
+    snap = current_snapshot(str(tmp_path))
+    filters = [{"attribute": "zoning", "operator": "contains", "value": "cc"}]
+
+    matches = [i for i, b in enumerate(buildings) if b["zoning"] and "cc" in b["zoning"].lower()]
+    present = [i for i in matches if buildings[i]["height_m"] is not None]
+    missing = [i for i in matches if buildings[i]["height_m"] is None]
+    expected = sorted(present, key=lambda i: (-buildings[i]["height_m"], i)) + missing
+
+    seen, cursor = [], None
+    while True:
+        page = query_snapshot(snap, filters, len(snap), "height_m", "desc", 7, decode_cursor(cursor) if cursor else None)
+        assert page["total"] == len(matches)
+        seen += [b["id"] for b in page["buildings"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [buildings[i]["id"] for i in expected]
+
+
+def test_malformed_cursor_key_is_a_query_error(tmp_path):
+    write_snapshot(str(tmp_path), _buildings(20))
+    snap = current_snapshot(str(tmp_path))
+    first = query_snapshot(snap, [], len(snap), "height_m", "desc", 5)
+    cursor = decode_cursor(first["next_cursor"])
+
+    for bad_key in (["x"], [0, "tall", 3], [0, 10.0], [True, 10.0, 3]):
+        with pytest.raises(QueryError):
+            query_snapshot(snap, [], len(snap), "height_m", "desc", 5, dict(cursor, k=bad_key))
+
+
+@pytest.mark.parametrize("sort", [["x"], {"height_m": 1}, 3])
+def test_non_string_sort_is_a_query_error(sort):
+    with pytest.raises(QueryError):
+        parse_page_params({"sort": sort})
+    with pytest.raises(QueryError):
+        parse_export_params({"sort": sort})
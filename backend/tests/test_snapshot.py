@@ -0,0 +1,45 @@
+import json
+
+from services.cityData import normalize_feature
+from services.snapshot import current_snapshot, write_snapshot
+
+FEATURES = [
+    {
+        "properties": {"struct_id": "A1", "stage": "Existing", "rooftop_elev_z": "1100.5", "grd_elev_max_z": "1050"},
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[[-114.06, 51.04], [-114.061, 51.04], [-114.061, 51.041], [-114.06, 51.04]]],
+        },
+    },
+    {
+        "properties": {"struct_id": "B2", "address": "1 Ave SW ü"},
+        "geometry": {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [[[-114.05, 51.05], [-114.051, 51.05], [-114.05, 51.051], [-114.05, 51.05]]],
+                [
+                    [[-114.07, 51.05], [-114.071, 51.05], [-114.07, 51.051], [-114.07, 51.05]],
+                    [[-114.0705, 51.0502], [-114.0706, 51.0502], [-114.0705, 51.0503], [-114.0705, 51.0502]],
+                ],
+            ],
+        },
+    },
+    {"properties": {"struct_id": "C3"}, "geometry": {}},
+]
+
+
+def _json(value):
+    # Tuples vs lists and int vs float aside, a building must come back exactly as it went in.
+    return json.loads(json.dumps(value))
+
+
+def test_building_round_trips_normalize_feature(tmp_path):
+    buildings = [normalize_feature(f) for f in FEATURES]
+    write_snapshot(str(tmp_path), buildings, {"fetched_at_unix": 5})
+    snap = current_snapshot(str(tmp_path))
+
+    assert len(snap) == len(buildings)
+    assert snap.meta["fetched_at_unix"] == 5
+    for i, expected in enumerate(buildings):
+        assert _json(snap.building(i)) == _json(expected)
+    assert snap.index_of("B2") == 1
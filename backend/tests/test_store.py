@@ -0,0 +1,23 @@
+import time
+
+import pytest
+
+from services import store
+
+
+def test_get_snapshot_gives_up_while_another_worker_fetches(tmp_path):
+    cfg = {"SNAPSHOT_DIR": str(tmp_path)}
+    with store._refresh_lock(str(tmp_path)) as held:
+        assert held
+        started = time.monotonic()
+        with pytest.raises(RuntimeError, match="another worker"):
+            store.get_snapshot(cfg, wait=0.3)
+    assert time.monotonic() - started < 2
+
+
+def test_refresh_lock_is_exclusive_and_released(tmp_path):
+    with store._refresh_lock(str(tmp_path)) as first:
+        with store._refresh_lock(str(tmp_path)) as second:
+            assert first and not second
+    with store._refresh_lock(str(tmp_path)) as again:
+        assert again
@@ -0,0 +1,43 @@
+import pytest
+
+from loadtest.fakes import SocrataStandIn, synthetic_rows
+from services import store
+
+DATASET = "test-buildings"
+
+
+@pytest.fixture
+def socrata():
+    stand_in = SocrataStandIn(synthetic_rows(5)).start()
+    yield stand_in
+    stand_in.stop()
+
+
+def test_incremental_sync_applies_update_delete_and_insert(socrata, tmp_path):
+    cfg = {
+        "SOCRATA_BASE_URL": f"{socrata.url}/resource",
+        "SNAPSHOT_DIR": str(tmp_path),
+        "HEIGHT_DATA": DATASET,
+        "SNAPSHOT_LIMIT": 5000,
+        "SNAPSHOT_SYNC": "incremental",
+        "DOWNTOWN_TOP": 51.058,
+        "DOWNTOWN_BOTTOM": 51.038,
+        "DOWNTOWN_LEFT": -114.12,
+        "DOWNTOWN_RIGHT": -114.04,
+    }
+    first = store.refresh_snapshot(cfg)
+    assert [b["id"] for b in first.buildings()] == ["100000", "100001", "100002", "100003", "100004"]
+
+    modified, deleted = socrata.rows[1], socrata.rows[3]
+    modified["rooftop_elev_z"] = f"{float(modified['grd_elev_max_z']) + 99:.2f}"
+    modified[":updated_at"] = "2024-02-01T00:00:00.000Z"
+    socrata.rows.remove(deleted)
+    new = dict(synthetic_rows(6)[5], **{":updated_at": "2024-02-02T00:00:00.000Z"})
+    socrata.rows.append(new)
+
+    second = store.refresh_snapshot(cfg)
+    assert second.version == first.version + 1
+    assert second.meta["high_water_mark"] == "2024-02-02T00:00:00.000Z"
+    assert [b["id"] for b in second.buildings()] == ["100000", "100001", "100002", "100004", "100005"]
+    assert second.building(second.index_of("100001"))["height_m"] == pytest.approx(99.0)
+    assert second.building(0) == first.building(0)
@@ -25,10 +25,16 @@ export default function App() {
   const [mapLoading, setMapLoading] = useState(true)
   const [mapError, setMapError] = useState('')
   const [selectedBuilding, setSelectedBuilding] = useState(null)
+  // Paged /filter or /query result on the map: { query, filters, total, nextCursor }
+  const [resultPage, setResultPage] = useState(null)
 
   const applyBuildingPayload = useCallback((payload, options = {}) => {
     const list = Array.isArray(payload?.buildings) ? payload.buildings : []
-    setVisibleBuildings(list)
+    if (options.append) {
+      setVisibleBuildings((prev) => [...prev, ...list])
+    } else {
+      setVisibleBuildings(list)
+    }
     setMapMeta((prev) => ({
       count: payload?.count ?? list.length,
       origin: payload?.origin || prev.origin,
@@ -117,11 +123,12 @@ export default function App() {
       const res = await api.runQuery(q)
       setActiveFilters(res.filters || [])
       applyBuildingPayload(res)
-      const count = res.count ?? res.buildings?.length ?? 0
+      const total = res.total ?? res.count ?? res.buildings?.length ?? 0
+      setResultPage({ query: q, filters: res.filters || [], total, nextCursor: res.next_cursor ?? null })
       setMessage(
         res.filters?.length
-          ? `${count} building${count === 1 ? '' : 's'} match`
-          : `No filters extracted; showing ${count} buildings`,
+          ? `${total} building${total === 1 ? '' : 's'} match`
+          : `No filters extracted; showing ${total} buildings`,
       )
     } catch (e) {
       setMessage(getErrorMessage(e, 'Query failed'))
@@ -166,6 +173,12 @@ export default function App() {
       let refreshBase = false
       if (filters.length) {
         payload = await api.postFilter(filters)
+        setResultPage({
+          query: null,
+          filters,
+          total: payload.total ?? payload.count ?? 0,
+          nextCursor: payload.next_cursor ?? null,
+        })
       } else if (allBuildings.length) {
         payload = {
           buildings: allBuildings,
@@ -178,9 +191,10 @@ export default function App() {
         refreshBase = true
       }
 
+      if (!filters.length) setResultPage(null)
       applyBuildingPayload(payload, { asBase: refreshBase })
       const count = filters.length
-        ? payload.count ?? payload.buildings?.length ?? 0
+        ? payload.total ?? payload.count ?? payload.buildings?.length ?? 0
         : allBuildings.length || payload.buildings?.length || 0
       const suffix = filters.length ? ` (${count} match${count === 1 ? '' : 'es'})` : ''
       setMessage(`Loaded "${p.name}"${suffix}`)
@@ -192,9 +206,27 @@ export default function App() {
     }
   }
 
+  const handleLoadMore = async () => {
+    if (!resultPage?.nextCursor) return
+    setLoading(true)
+    try {
+      const res = resultPage.query
+        ? await api.runQuery(resultPage.query, { cursor: resultPage.nextCursor, filters: resultPage.filters })
+        : await api.postFilter(resultPage.filters, resultPage.nextCursor)
+      applyBuildingPayload(res, { append: true, keepSelection: true })
+      setResultPage((prev) => ({ ...prev, total: res.total ?? prev.total, nextCursor: res.next_cursor ?? null }))
+    } catch (e) {
+      // A 410 means the data was refreshed since the first page; the message asks to run the search again
+      setMessage(getErrorMessage(e, 'Loading more buildings failed'))
+    } finally {
+      setLoading(false)
+    }
+  }
+
   const handleResetView = () => {
     if (!allBuildings.length) return
     setActiveFilters([])
+    setResultPage(null)
     applyBuildingPayload(
       {
         buildings: allBuildings,
@@ -272,9 +304,24 @@ export default function App() {
             <p className="text-2xl font-semibold text-white">
               {visibleBuildings.length.toLocaleString('en-CA')}
             </p>
+            {resultPage && resultPage.total > visibleBuildings.length && (
+              <p className="text-[11px] text-slate-400 mt-0.5">
+                of {resultPage.total.toLocaleString('en-CA')} matches
+              </p>
+            )}
             {fetchedAtLabel && (
               <p className="text-[11px] text-slate-400 mt-0.5">Updated {fetchedAtLabel}</p>
             )}
+            {resultPage?.nextCursor && (
+              <button
+                type="button"
+                onClick={handleLoadMore}
+                disabled={loading}
+                className="mt-2 px-3 py-1.5 text-xs font-medium bg-slate-700 hover:bg-slate-600 text-slate-100 rounded disabled:opacity-40"
+              >
+                Load more
+              </button>
+            )}
           </div>
           {activeFilters.length > 0 && (
             <div className="pointer-events-auto bg-slate-900/85 border border-slate-700 rounded-lg px-4 py-3 shadow-lg max-w-xs">
@@ -28,10 +28,12 @@ export async function getBuildings(options = {}) {
   }
 }
 
-export async function postFilter(filters) {
+export async function postFilter(filters, cursor) {
+  const body = { filters: filters || [] }
+  if (cursor) body.cursor = cursor
   const data = await request('/filter', {
     method: 'POST',
-    body: { filters: filters || [] },
+    body,
   })
   return data
 }
@@ -68,9 +70,15 @@ export async function loadProject(projectId) {
   return request(`/projects/${projectId}`)
 }
 
-export async function runQuery(query) {
+export async function runQuery(query, options = {}) {
+  const body = { query: query.trim() }
+  // Later pages send back the first page's filters so the backend does not ask the model again
+  if (options.cursor) {
+    body.cursor = options.cursor
+    body.filters = options.filters || []
+  }
   return request('/query', {
     method: 'POST',
-    body: { query: query.trim() },
+    body,
   })
 }